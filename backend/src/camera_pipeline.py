@@ -0,0 +1,215 @@
+"""Camera capture, hand tracking and preview publishing on separate threads
+
+Running the three steps one after another in one loop lets frames pile up
+in the camera's buffer whenever tracking or the UI update is slow, and the
+preview falls seconds behind. Here every stage has its own thread, and the
+stages are connected by slots that hold a single item: a new frame
+replaces one the next stage has not picked up yet. Each stage therefore
+always works on the newest frame, and a slow stage costs frame rate
+instead of latency.
+
+Every stage counts the frames it processed, its recent throughput and
+busy time, and the frames that were replaced in its input slot before it
+got to them. With a FrameScheduler, the publishing stage waits for its
+next deadline and then takes the newest result, dropping the ones that
+arrived in between.
+"""
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class CapturedFrame:
+    index: int
+    image: np.ndarray
+    captured_at: float  # time.monotonic() when the frame was read
+
+
+class LatestSlot:
+    """Queue of size one in which a new item replaces the one not taken yet"""
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._item = None
+        self._full = False
+        self._closed = False
+        self.dropped = 0  # Items replaced before anyone took them
+
+    def put(self, item):
+        with self._condition:
+            if self._full:
+                self.dropped += 1
+            self._item = item
+            self._full = True
+            self._condition.notify()
+
+    def get(self):
+        """Wait for the newest item, or None once the slot is closed and empty"""
+        with self._condition:
+            while not self._full and not self._closed:
+                self._condition.wait()
+            if not self._full:
+                return None
+            item, self._item, self._full = self._item, None, False
+            return item
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class StageStats:
+    """Processed frames, throughput and busy time of one pipeline stage"""
+    def __init__(self, name, window=2.0, history=300):
+        self.name = name
+        self.window = window
+        self.processed = 0
+        self._lock = threading.Lock()
+        self._finished_at = deque()
+        self._busy = deque(maxlen=history)
+
+    def record(self, started_at, finished_at):
+        with self._lock:
+            self.processed += 1
+            self._busy.append(finished_at - started_at)
+            self._finished_at.append(finished_at)
+            self._forget_before(finished_at - self.window)
+
+    def _forget_before(self, since):
+        while self._finished_at and self._finished_at[0] < since:
+            self._finished_at.popleft()
+
+    def snapshot(self, dropped=0):
+        with self._lock:
+            self._forget_before(time.monotonic() - self.window)
+            recent = len(self._finished_at)
+            busy_ms = np.array(self._busy) * 1000
+        return {
+            "processed": self.processed,
+            "dropped": dropped,
+            "fps": recent / self.window,
+            "busy_p50_ms": float(np.percentile(busy_ms, 50)) if len(busy_ms) else 0.0,
+            "busy_p99_ms": float(np.percentile(busy_ms, 99)) if len(busy_ms) else 0.0,
+        }
+
+
+class CameraPipeline:
+    """Capture, track and publish stages connected by latest-wins slots"""
+    def __init__(self, source, track, publish, prepare=None, on_end=None, scheduler=None):
+        """
+        source: FrameSource to read from
+        track: callable(frame) -> result, on the tracking thread
+        publish: callable(frame, result) that shows the result, on the publishing thread
+        prepare: optional callable(frame) -> frame run right after capture, e.g. a flip
+        on_end: optional callable() when the source runs out of frames
+        scheduler: optional FrameScheduler pacing the publishing stage
+        """
+        self.source = source
+        self.track = track
+        self.publish = publish
+        self.prepare = prepare
+        self.on_end = on_end
+        self.scheduler = scheduler
+
+        self._tracking_slot = LatestSlot()
+        self._publishing_slot = LatestSlot()
+        self._stats = {name: StageStats(name) for name in ("capture", "track", "publish")}
+        self._latency_lock = threading.Lock()
+        self._latency = deque(maxlen=300)  # Capture to publish, in seconds
+        self._stopped = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Start the stages; a pipeline runs once and cannot be restarted after stop()"""
+        self._threads = [
+            threading.Thread(target=target, name=f"camera-{name}", daemon=True)
+            for name, target in (("capture", self._capture), ("track", self._track), ("publish", self._publish))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout=1.0):
+        """Stop all stages; the source is left open for its owner to release"""
+        self._stopped.set()
+        self._tracking_slot.close()
+        self._publishing_slot.close()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=timeout)
+        self._threads = []
+
+    @property
+    def running(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    def stats(self):
+        """Per-stage counters, plus the capture to publish latency in milliseconds"""
+        with self._latency_lock:
+            latency_ms = np.array(self._latency) * 1000
+        stats = {
+            "capture": self._stats["capture"].snapshot(),
+            "track": self._stats["track"].snapshot(self._tracking_slot.dropped),
+            "publish": self._stats["publish"].snapshot(self._publishing_slot.dropped),
+            "latency_p50_ms": float(np.percentile(latency_ms, 50)) if len(latency_ms) else 0.0,
+            "latency_p99_ms": float(np.percentile(latency_ms, 99)) if len(latency_ms) else 0.0,
+        }
+        if self.scheduler is not None:
+            stats["schedule"] = self.scheduler.stats()
+        return stats
+
+    def _capture(self):
+        index = 0
+        while not self._stopped.is_set() and self.source.is_opened():
+            started_at = time.monotonic()
+            ret, frame = self.source.read()
+            if not ret:
+                print("Failed to capture frame")
+                break
+            if self.prepare is not None:
+                frame = self.prepare(frame)
+            captured_at = time.monotonic()
+            self._tracking_slot.put(CapturedFrame(index, frame, captured_at))
+            self._stats["capture"].record(started_at, captured_at)
+            index += 1
+        # Let the later stages finish the frames already handed over
+        self._tracking_slot.close()
+        if not self._stopped.is_set() and self.on_end is not None:
+            self.on_end()
+
+    def _track(self):
+        while not self._stopped.is_set():
+            captured = self._tracking_slot.get()
+            if captured is None:
+                break
+            started_at = time.monotonic()
+            try:
+                result = self.track(captured.image)
+            except Exception as e:
+                print(f"Error tracking frame: {e}")
+                continue
+            self._publishing_slot.put((captured, result))
+            self._stats["track"].record(started_at, time.monotonic())
+        self._publishing_slot.close()
+
+    def _publish(self):
+        while not self._stopped.is_set():
+            if self.scheduler is not None:
+                self.scheduler.wait()
+            item = self._publishing_slot.get()
+            if item is None:
+                break
+            captured, result = item
+            started_at = time.monotonic()
+            try:
+                self.publish(captured.image, result)
+            except Exception as e:
+                print(f"Error publishing frame: {e}")
+                continue
+            finished_at = time.monotonic()
+            with self._latency_lock:
+                self._latency.append(finished_at - captured.captured_at)
+            self._stats["publish"].record(started_at, finished_at)
@@ -0,0 +1,133 @@
+"""Micro-batching dispatcher in front of a shared HandModel
+
+Requests from any session are queued as preprocessed 28x28 images. A single
+worker thread flushes a batch as soon as it holds max_batch_size images or
+the oldest request has waited max_wait_ms, runs one forward pass and
+resolves each request's future with its own row of the result.
+"""
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class RecognitionDispatcher:
+    """Coalesces concurrent predictions into batched forward passes"""
+
+    def __init__(self, model, max_batch_size=8, max_wait_ms=4.0, top_k=3):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.top_k = top_k
+
+        self._queue = queue.Queue()
+        self._closed = False
+        self._submit_lock = threading.Lock()  # Nothing may be queued after the shutdown sentinel
+
+        # Metrics
+        self._stats_lock = threading.Lock()
+        self.batch_sizes = Counter()
+        self._wait_times = deque(maxlen=1000)  # Seconds from submit to batch start
+        self.requests = 0
+
+        self._worker = threading.Thread(target=self._run, name="recognition-dispatcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, image):
+        """Queue one 28x28 image, the future resolves to (labels, confidences) of length top_k"""
+        future = Future()
+        with self._submit_lock:
+            if self._closed:
+                raise RuntimeError("Dispatcher is closed")
+            self._queue.put((image, future, time.perf_counter()))
+        return future
+
+    def predict_batch(self, images, top_k=3):
+        """Same interface as HandModel.predict_batch, served through the shared batches"""
+        if top_k > self.top_k:
+            raise ValueError(f"Dispatcher only keeps the top {self.top_k} predictions")
+        futures = [self.submit(image) for image in images]
+        results = [future.result() for future in futures]
+        if not results:
+            return self.model.predict_batch([], top_k)
+        labels = np.stack([labels for labels, _ in results])[:, :top_k]
+        confidences = np.stack([confidences for _, confidences in results])[:, :top_k]
+        return labels, confidences
+
+    def _collect(self):
+        """Block for the first request, then gather more until the batch is full or the deadline passes"""
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = first[2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # Let the loop see the shutdown after this batch
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                break
+            self._run_batch(batch)
+        self._fail_pending()
+
+    def _run_batch(self, batch):
+        """One forward pass for the batch, resolving every request's future"""
+        started = time.perf_counter()
+        with self._stats_lock:
+            self.batch_sizes[len(batch)] += 1
+            self.requests += len(batch)
+            self._wait_times.extend(started - submitted for _, _, submitted in batch)
+
+        try:
+            labels, confidences = self.model.predict_batch([image for image, _, _ in batch], self.top_k)
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        for i, (_, future, _) in enumerate(batch):
+            future.set_result((labels[i], confidences[i]))
+
+    def _fail_pending(self):
+        """Fail whatever is still queued once the worker stops, so no caller waits forever"""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None:
+                item[1].set_exception(RuntimeError("Dispatcher is closed"))
+
+    def stats(self):
+        """Queue depth, batch-size histogram and wait time percentiles in milliseconds"""
+        with self._stats_lock:
+            waits = np.array(self._wait_times) * 1000
+            return {
+                "queue_depth": self._queue.qsize(),
+                "requests": self.requests,
+                "batch_sizes": dict(sorted(self.batch_sizes.items())),
+                "wait_p50_ms": float(np.percentile(waits, 50)) if len(waits) else 0.0,
+                "wait_p99_ms": float(np.percentile(waits, 99)) if len(waits) else 0.0,
+            }
+
+    def close(self):
+        """Finish queued requests and stop the worker thread"""
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._worker.join(timeout=1.0)
@@ -0,0 +1,159 @@
+"""Bulk evaluation of HandModel over a directory or glob of glyph images
+
+Images are decoded on a thread pool a few batches ahead of the model, which
+predicts them in batches. Per-file results are streamed to CSV or JSONL as
+they come in, and when labels can be read from the file names the aggregate
+accuracy is printed at the end.
+
+    python -m backend.src.evaluate "glyphs/**/*.png" --output results.jsonl
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+from backend.src.hand_model import HandModel, MODEL_PATH
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+# "A_0001.png", "a-12.png", "7.png": the label is the leading character
+DEFAULT_LABEL_PATTERN = r"^([0-9A-Za-z])(?=[_\-.])"
+
+
+def find_images(pattern):
+    """Sorted image paths in a directory (recursively) or matching a glob"""
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "**", "*")
+    return sorted(p for p in glob.glob(pattern, recursive=True) if p.lower().endswith(IMAGE_EXTENSIONS))
+
+
+def label_for(path, pattern=DEFAULT_LABEL_PATTERN):
+    """Label from the file name, or from a one-character parent directory, else None"""
+    match = re.search(pattern, os.path.basename(path))
+    if match:
+        return match.group(1)
+    parent = os.path.basename(os.path.dirname(path))
+    return parent if len(parent) == 1 else None
+
+
+def load_image(path):
+    """Grayscale 28x28 image, or None if it cannot be decoded"""
+    img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+    if img is not None and img.shape != (28, 28):
+        img = cv2.resize(img, (28, 28), interpolation=cv2.INTER_AREA)
+    return img
+
+
+def iter_decoded(paths, batch_size=64, workers=4, prefetch=4):
+    """Yield (paths, images) batches, decoding up to prefetch batches ahead"""
+    chunks = (paths[i:i + batch_size] for i in range(0, len(paths), batch_size))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+
+        def submit_next():
+            chunk = next(chunks, None)
+            if chunk is not None:
+                pending.append((chunk, [pool.submit(load_image, p) for p in chunk]))
+
+        for _ in range(prefetch):
+            submit_next()
+        while pending:
+            chunk, futures = pending.popleft()
+            submit_next()
+            yield chunk, [future.result() for future in futures]
+
+
+def evaluate(model, paths, batch_size=64, workers=4, prefetch=4, label_pattern=DEFAULT_LABEL_PATTERN):
+    """Yield one result dict per file, in input order"""
+    for chunk, images in iter_decoded(paths, batch_size, workers, prefetch):
+        readable = [i for i, img in enumerate(images) if img is not None]
+        labels, confidences = model.predict_batch([images[i] for i in readable], top_k=3)
+        predictions = dict(zip(readable, zip(labels, confidences)))
+
+        for i, path in enumerate(chunk):
+            label = label_for(path, label_pattern) if label_pattern else None
+            result = {"path": path, "label": label, "prediction": None, "confidence": 0.0,
+                      "top3": "", "correct": None}
+            if i in predictions:
+                top_labels, top_scores = predictions[i]
+                result.update(
+                    prediction=str(top_labels[0]),
+                    confidence=round(float(top_scores[0]), 6),
+                    top3=" ".join(f"{l}:{s:.4f}" for l, s in zip(top_labels, top_scores)),
+                    correct=None if label is None else bool(top_labels[0] == label),
+                )
+            yield result
+
+
+class ResultWriter:
+    """Streams result rows to a .csv file or JSON lines"""
+
+    FIELDS = ("path", "label", "prediction", "confidence", "top3", "correct")
+
+    def __init__(self, path):
+        self.file = open(path, "w", newline="")
+        self.csv = None
+        if path.lower().endswith(".csv"):
+            self.csv = csv.DictWriter(self.file, fieldnames=self.FIELDS)
+            self.csv.writeheader()
+
+    def write(self, row):
+        if self.csv:
+            self.csv.writerow(row)
+        else:
+            self.file.write(json.dumps(row) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the letter model on a directory or glob of images")
+    parser.add_argument("images", help="Directory or glob pattern (quote it to keep ** from the shell)")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--backend", default=None)
+    parser.add_argument("--output", help="Results file, .csv or .jsonl")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=4, help="Decoding threads")
+    parser.add_argument("--prefetch", type=int, default=4, help="Batches decoded ahead of the model")
+    parser.add_argument("--label-pattern", default=DEFAULT_LABEL_PATTERN,
+                        help="Regex with one group extracting the label from the file name, '' to disable")
+    args = parser.parse_args()
+
+    paths = find_images(args.images)
+    if not paths:
+        raise SystemExit(f"No images found for {args.images}")
+
+    model = HandModel(args.model, backend=args.backend)
+    writer = ResultWriter(args.output) if args.output else None
+
+    start = time.perf_counter()
+    total = labeled = correct = unreadable = 0
+    try:
+        for row in evaluate(model, paths, args.batch_size, args.workers, args.prefetch, args.label_pattern):
+            total += 1
+            unreadable += row["prediction"] is None
+            if row["correct"] is not None:
+                labeled += 1
+                correct += row["correct"]
+            if writer:
+                writer.write(row)
+    finally:
+        if writer:
+            writer.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"Evaluated {total} images in {elapsed:.1f}s ({total / elapsed:.0f} images/s), {unreadable} unreadable")
+    if labeled:
+        print(f"Accuracy: {correct / labeled:.2%} on {labeled} labeled images")
+
+
+if __name__ == "__main__":
+    main()
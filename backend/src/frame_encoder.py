@@ -0,0 +1,98 @@
+"""JPEG/base64 encoding of preview frames for the UI
+
+The previews are sent to Flet as base64 JPEGs. The encoder resizes the
+NumPy frame straight into a reused buffer of the target size and encodes
+it with cv2.imencode, with no RGB conversion or PIL image in between.
+Frames tagged with a version, like the drawing canvas, are not encoded
+again until the version changes. One encoder may be shared by several
+threads; encodes run one at a time, as they share the resize buffer.
+"""
+import base64
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+
+class FrameEncoder:
+    """Encodes BGR or grayscale frames to base64 JPEG at a fixed size"""
+
+    def __init__(self, size, quality=90, history=300):
+        """
+        size: (width, height) of the encoded image
+        quality: JPEG quality
+        history: number of recent encode times kept for the percentiles
+        """
+        self.size = tuple(size)
+        self.params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+        self._lock = threading.Lock()  # Held for a whole encode, which reuses the buffers
+        self._buffers = {}  # Resize target per channel count
+        self._version = None
+        self._encoded = None
+
+        # Metrics
+        self._stats_lock = threading.Lock()
+        self._encode_times = deque(maxlen=history)
+        self._sizes = deque(maxlen=history)
+        self.frames = 0
+        self.skipped = 0
+
+    def _buffer_for(self, frame):
+        channels = 1 if frame.ndim == 2 else frame.shape[2]
+        buffer = self._buffers.get(channels)
+        if buffer is None:
+            width, height = self.size
+            shape = (height, width) if channels == 1 else (height, width, channels)
+            buffer = self._buffers[channels] = np.empty(shape, dtype=np.uint8)
+        return buffer
+
+    def encode(self, frame, version=None):
+        """Base64 JPEG of the frame, or None when version is the one encoded last time"""
+        with self._lock:
+            if version is not None and version == self._version:
+                with self._stats_lock:
+                    self.skipped += 1
+                return None
+
+            start = time.perf_counter()
+            if frame.shape[1::-1] != self.size:
+                resized = cv2.resize(frame, self.size, dst=self._buffer_for(frame), interpolation=cv2.INTER_AREA)
+            else:
+                resized = frame
+            ok, jpeg = cv2.imencode(".jpg", resized, self.params)
+            if not ok:
+                raise ValueError("Could not encode frame")
+            encoded = base64.b64encode(jpeg).decode("ascii")
+            elapsed = time.perf_counter() - start
+
+            with self._stats_lock:
+                self.frames += 1
+                self._encode_times.append(elapsed)
+                self._sizes.append(len(jpeg))
+            self._version = version
+            self._encoded = encoded
+            return encoded
+
+    @property
+    def last(self):
+        """The most recent encoding, also when later calls were skipped"""
+        return self._encoded
+
+    def reset(self):
+        """Encode the next frame even if its version did not change"""
+        with self._lock:
+            self._version = None
+
+    def stats(self):
+        """Encoded and skipped frame counts, encode time percentiles in milliseconds and mean JPEG size"""
+        with self._stats_lock:
+            times = np.array(self._encode_times) * 1000
+            return {
+                "frames": self.frames,
+                "skipped": self.skipped,
+                "encode_p50_ms": float(np.percentile(times, 50)) if len(times) else 0.0,
+                "encode_p99_ms": float(np.percentile(times, 99)) if len(times) else 0.0,
+                "mean_bytes": float(np.mean(self._sizes)) if self._sizes else 0.0,
+            }
@@ -0,0 +1,103 @@
+"""Deadline-based pacing of the camera previews
+
+Sleeping a fixed time after each frame makes the frame rate depend on how
+long the frame took. FrameScheduler instead keeps a deadline per frame at
+the target rate and sleeps only until the next one. A frame that misses
+deadlines skips them rather than trying to catch up, so the loop never
+bursts to make up for lost time.
+
+Page updates are timed as well. While they take longer than a frame the
+client cannot keep up, and the interval grows with the update time, down
+to min_fps, so no frames are encoded only to be waited on. It returns to
+the target rate once updates are fast again.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class FrameScheduler:
+    def __init__(self, target_fps=30.0, min_fps=5.0, backoff=1.5, smoothing=0.2, window=2.0):
+        """
+        target_fps: frame rate while the client keeps up
+        min_fps: lowest frame rate the backoff goes down to
+        backoff: interval as a multiple of the update time while updates are too slow
+        smoothing: weight of the newest update time in its moving average
+        window: seconds over which the actual frame rate is measured
+        """
+        self.target_fps = target_fps
+        self.min_fps = min_fps
+        self.backoff = backoff
+        self.smoothing = smoothing
+        self.window = window
+        self.base_interval = 1.0 / target_fps
+        self._lock = threading.Lock()  # stats() may be called from other threads
+        self.reset()
+
+    def reset(self):
+        """Start over, e.g. when the camera restarts"""
+        self.interval = self.base_interval
+        self.update_time = 0.0  # Moving average of page update times, in seconds
+        self._deadline = None
+        self._frame_times = deque()
+        self.frames = 0
+        self.skipped = 0
+
+    def wait(self):
+        """Sleep until the next frame is due, skipping the deadlines already missed"""
+        now = time.monotonic()
+        if self._deadline is None:
+            self._deadline = now
+        if now < self._deadline:
+            time.sleep(self._deadline - now)
+            now = self._deadline
+        else:
+            missed = int((now - self._deadline) / self.interval)
+            self.skipped += missed
+            self._deadline += missed * self.interval
+        self._deadline += self.interval
+
+        with self._lock:
+            self.frames += 1
+            self._frame_times.append(now)
+            while self._frame_times[0] < now - self.window:
+                self._frame_times.popleft()
+
+    @contextmanager
+    def measure_update(self):
+        """Time a page update and adapt the frame interval to it"""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.record_update(time.monotonic() - start)
+
+    def record_update(self, duration):
+        if self.update_time == 0.0:
+            self.update_time = duration
+        else:
+            self.update_time += self.smoothing * (duration - self.update_time)
+        if self.update_time > self.base_interval:
+            self.interval = min(1.0 / self.min_fps, self.update_time * self.backoff)
+        else:
+            self.interval = self.base_interval
+
+    @property
+    def backed_off(self):
+        return self.interval > self.base_interval
+
+    def stats(self):
+        """Target and measured frame rate, current interval, update time and skipped deadlines"""
+        with self._lock:
+            times = list(self._frame_times)
+        fps = (len(times) - 1) / (times[-1] - times[0]) if len(times) > 1 and times[-1] > times[0] else 0.0
+        return {
+            "target_fps": self.target_fps,
+            "fps": fps,
+            "interval_ms": self.interval * 1000,
+            "update_ms": self.update_time * 1000,
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "backed_off": self.backed_off,
+        }
@@ -0,0 +1,305 @@
+"""Frame sources for the vision pipeline: live camera, video file or recorded session
+
+All sources share one small interface (read, is_opened, release, the frame
+size and the timestamp of the last frame), so the tracking loops do not care
+where frames come from and can run on machines without a webcam.
+
+Recorded sessions are a directory holding the frames as concatenated JPEGs
+in frames.bin, an index.npy of (offset, size, timestamp) per frame and a
+meta.json. Both files are memory-mapped, so any frame can be decoded
+without reading the ones before it.
+
+Timestamps of files and sessions come from the recording, not from the
+wall clock, so replaying the same source twice feeds HandTracker the same
+frames at the same times. With realtime=True, read() also waits until a
+frame is due, for playback in the UI.
+
+    python -m backend.src.frame_source record session_dir --seconds 10
+    python -m backend.src.frame_source convert clip.mp4 session_dir
+"""
+import argparse
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+
+import cv2
+import numpy as np
+
+INDEX_DTYPE = np.dtype([("offset", np.int64), ("size", np.int64), ("timestamp", np.float64)])
+
+
+class PlaybackClock:
+    """Time of the frame being played, in seconds since the first frame
+
+    Replays set the time from frame timestamps, so now() is the same on every
+    run. In realtime mode wait_until() sleeps until a timestamp is due on the
+    wall clock, measured from the first call.
+    """
+    def __init__(self, realtime=False):
+        self.realtime = realtime
+        self._now = 0.0
+        self._started_at = None
+
+    def now(self):
+        return self._now
+
+    def wait_until(self, timestamp):
+        if self.realtime:
+            if self._started_at is None:
+                self._started_at = time.monotonic() - timestamp
+            delay = self._started_at + timestamp - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        self._now = timestamp
+
+    def restart(self):
+        self._started_at = None
+
+
+class FrameSource(ABC):
+    """Common interface of all frame sources"""
+    width = 0
+    height = 0
+    fps = 0.0
+
+    def __init__(self):
+        self.timestamp = 0.0  # Of the last frame returned by read()
+
+    @abstractmethod
+    def read(self):
+        """(True, frame) with a BGR frame, or (False, None) when there are no more frames"""
+
+    @abstractmethod
+    def is_opened(self):
+        """Whether read() can still return frames"""
+
+    def release(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def __iter__(self):
+        while True:
+            ret, frame = self.read()
+            if not ret:
+                return
+            yield frame
+
+
+class CameraSource(FrameSource):
+    """Live camera, timestamped with the wall clock"""
+    def __init__(self, index=0):
+        super().__init__()
+        self.capture = cv2.VideoCapture(index)
+        self.width = int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS) or 30.0
+        self._started_at = time.monotonic()
+
+    def read(self):
+        ret, frame = self.capture.read()
+        self.timestamp = time.monotonic() - self._started_at
+        return ret, frame if ret else None
+
+    def is_opened(self):
+        return self.capture is not None and self.capture.isOpened()
+
+    def release(self):
+        if self.capture is not None:
+            self.capture.release()
+            self.capture = None
+
+
+class VideoFileSource(FrameSource):
+    """Frames of a video file, timestamped by frame number and frame rate"""
+    def __init__(self, path, realtime=False, loop=False, fps=None):
+        super().__init__()
+        self.path = path
+        self.loop = loop
+        self.capture = cv2.VideoCapture(path)
+        self.width = int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.fps = fps or self.capture.get(cv2.CAP_PROP_FPS) or 30.0
+        self.clock = PlaybackClock(realtime)
+        self._frame_index = 0
+
+    def read(self):
+        if not self.is_opened():
+            return False, None
+        ret, frame = self.capture.read()
+        if not ret and self.loop and self._frame_index > 0:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.capture.read()
+        if not ret:
+            return False, None
+        # Timestamps keep growing across loops, like a camera's would
+        self.timestamp = self._frame_index / self.fps
+        self._frame_index += 1
+        self.clock.wait_until(self.timestamp)
+        return True, frame
+
+    def is_opened(self):
+        return self.capture is not None and self.capture.isOpened()
+
+    def release(self):
+        if self.capture is not None:
+            self.capture.release()
+            self.capture = None
+
+
+class RecordedSession(FrameSource):
+    """Memory-mapped recorded session with random access to every frame"""
+    def __init__(self, path, realtime=False, loop=False):
+        super().__init__()
+        self.path = path
+        self.loop = loop
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.width, self.height = self.meta["width"], self.meta["height"]
+        self.fps = self.meta["fps"]
+        self.index = np.load(os.path.join(path, "index.npy"), mmap_mode="r")
+        self._data = np.memmap(os.path.join(path, "frames.bin"), dtype=np.uint8, mode="r") \
+            if len(self.index) else np.zeros(0, dtype=np.uint8)
+        self.clock = PlaybackClock(realtime)
+        self.position = 0
+        self._loop_offset = 0.0
+        self._open = True
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def timestamps(self):
+        return self.index["timestamp"]
+
+    def frame(self, i):
+        """Decoded BGR frame number i"""
+        offset, size, _ = self.index[i]
+        return cv2.imdecode(self._data[offset:offset + size], cv2.IMREAD_COLOR)
+
+    def seek(self, i):
+        """Continue reading from frame number i"""
+        self.position = i
+        self.clock.restart()
+
+    def read(self):
+        if not self._open or len(self) == 0:
+            return False, None
+        if self.position >= len(self):
+            if not self.loop:
+                return False, None
+            # Timestamps keep growing across loops, like a camera's would
+            # The recording may not start at 0, so add its length, not its last timestamp
+            self._loop_offset += float(self.timestamps[-1] - self.timestamps[0]) + 1.0 / self.fps
+            self.position = 0
+        frame = self.frame(self.position)
+        self.timestamp = self._loop_offset + float(self.timestamps[self.position])
+        self.position += 1
+        self.clock.wait_until(self.timestamp)
+        return True, frame
+
+    def is_opened(self):
+        return self._open
+
+    def release(self):
+        self._open = False
+
+
+class SessionRecorder:
+    """Writes frames and their timestamps in the recorded session format"""
+    def __init__(self, path, fps=30.0, quality=90):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.fps = fps
+        self.quality = quality
+        self._frames = open(os.path.join(path, "frames.bin"), "wb")
+        self._index = []
+        self._size = None
+
+    def write(self, frame, timestamp):
+        ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            raise ValueError("Could not encode frame")
+        offset = self._index[-1][0] + self._index[-1][1] if self._index else 0
+        self._frames.write(encoded.tobytes())
+        self._index.append((offset, len(encoded), timestamp))
+        self._size = frame.shape[1], frame.shape[0]
+
+    def close(self):
+        if self._frames.closed:
+            return
+        self._frames.close()
+        np.save(os.path.join(self.path, "index.npy"), np.array(self._index, dtype=INDEX_DTYPE))
+        width, height = self._size or (0, 0)
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump({"width": width, "height": height, "fps": self.fps, "quality": self.quality}, f, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def is_recorded_session(path):
+    return os.path.isfile(os.path.join(str(path), "index.npy"))
+
+
+def open_source(spec=0, realtime=False, loop=False):
+    """Frame source for a camera index, a recorded session directory or a video file"""
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return CameraSource(int(spec))
+    if is_recorded_session(spec):
+        return RecordedSession(spec, realtime=realtime, loop=loop)
+    if not os.path.exists(spec):
+        raise FileNotFoundError(f"No camera, session or video at {spec}")
+    return VideoFileSource(spec, realtime=realtime, loop=loop)
+
+
+def record(source, path, max_frames=None, seconds=None, quality=90):
+    """Copy frames from a source into a recorded session, returns the number of frames"""
+    count = 0
+    with SessionRecorder(path, fps=source.fps, quality=quality) as recorder:
+        for frame in source:
+            if seconds is not None and source.timestamp > seconds:
+                break
+            recorder.write(frame, source.timestamp)
+            count += 1
+            if max_frames is not None and count >= max_frames:
+                break
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or convert sessions for replay")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record_parser = commands.add_parser("record", help="Record a session from a camera")
+    record_parser.add_argument("output")
+    record_parser.add_argument("--camera", type=int, default=0)
+    record_parser.add_argument("--seconds", type=float, default=10.0)
+    convert_parser = commands.add_parser("convert", help="Convert a video file into a session")
+    convert_parser.add_argument("video")
+    convert_parser.add_argument("output")
+    convert_parser.add_argument("--max-frames", type=int)
+    for command in (record_parser, convert_parser):
+        command.add_argument("--quality", type=int, default=90, help="JPEG quality of the stored frames")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        with CameraSource(args.camera) as source:
+            if not source.is_opened():
+                raise SystemExit(f"Could not open camera {args.camera}")
+            count = record(source, args.output, seconds=args.seconds, quality=args.quality)
+    else:
+        with VideoFileSource(args.video) as source:
+            count = record(source, args.output, max_frames=args.max_frames, quality=args.quality)
+    print(f"Wrote {count} frames to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Synthetic A-Z glyphs drawn from stroke templates
+
+Every letter is a list of strokes, each stroke a polyline in the unit square
+(x to the right, y down). The templates are rendered with a random affine
+jitter so calibration, benchmarks and template matching can run without a
+dataset or a webcam.
+"""
+import string
+
+import cv2
+import numpy as np
+
+
+def _arc(cx, cy, rx, ry, start_deg, end_deg, steps=12):
+    """Points along an elliptic arc, angles grow clockwise on screen"""
+    angles = np.radians(np.linspace(start_deg, end_deg, steps))
+    return [(cx + rx * np.cos(a), cy + ry * np.sin(a)) for a in angles]
+
+
+_P_BOWL = [(0, 1), (0, 0), (0.7, 0), (0.9, 0.15), (0.9, 0.35), (0.7, 0.5), (0, 0.5)]
+
+LETTER_STROKES = {
+    "A": [[(0, 1), (0.5, 0), (1, 1)], [(0.25, 0.5), (0.75, 0.5)]],
+    "B": [[(0, 0), (0, 1)],
+          [(0, 0), (0.6, 0), (0.8, 0.1), (0.8, 0.35), (0.6, 0.5), (0, 0.5)],
+          [(0.6, 0.5), (0.9, 0.6), (0.9, 0.9), (0.7, 1), (0, 1)]],
+    "C": [_arc(0.5, 0.5, 0.5, 0.5, -45, -315)],
+    "D": [[(0, 0), (0, 1)], [(0, 0), (0.5, 0), (0.9, 0.25), (0.9, 0.75), (0.5, 1), (0, 1)]],
+    "E": [[(1, 0), (0, 0), (0, 1), (1, 1)], [(0, 0.5), (0.7, 0.5)]],
+    "F": [[(1, 0), (0, 0), (0, 1)], [(0, 0.5), (0.7, 0.5)]],
+    "G": [_arc(0.5, 0.5, 0.5, 0.5, -45, -360) + [(0.55, 0.5)]],
+    "H": [[(0, 0), (0, 1)], [(1, 0), (1, 1)], [(0, 0.5), (1, 0.5)]],
+    "I": [[(0.5, 0), (0.5, 1)], [(0.2, 0), (0.8, 0)], [(0.2, 1), (0.8, 1)]],
+    "J": [[(0.3, 0), (1, 0)], [(0.75, 0)] + _arc(0.45, 0.75, 0.3, 0.25, 0, 180)],
+    "K": [[(0, 0), (0, 1)], [(1, 0), (0, 0.55)], [(0.3, 0.4), (1, 1)]],
+    "L": [[(0, 0), (0, 1), (1, 1)]],
+    "M": [[(0, 1), (0, 0), (0.5, 0.6), (1, 0), (1, 1)]],
+    "N": [[(0, 1), (0, 0), (1, 1), (1, 0)]],
+    "O": [_arc(0.5, 0.5, 0.45, 0.5, -90, 270, steps=16)],
+    "P": [_P_BOWL],
+    "Q": [_arc(0.5, 0.5, 0.45, 0.5, -90, 270, steps=16), [(0.6, 0.7), (1, 1)]],
+    "R": [_P_BOWL, [(0.4, 0.5), (1, 1)]],
+    "S": [[(0.9, 0.1), (0.6, 0), (0.3, 0), (0.05, 0.15), (0.1, 0.4), (0.5, 0.5),
+           (0.9, 0.6), (0.95, 0.85), (0.7, 1), (0.3, 1), (0.05, 0.9)]],
+    "T": [[(0, 0), (1, 0)], [(0.5, 0), (0.5, 1)]],
+    "U": [[(0, 0)] + _arc(0.5, 0.7, 0.5, 0.3, 180, 0) + [(1, 0)]],
+    "V": [[(0, 0), (0.5, 1), (1, 0)]],
+    "W": [[(0, 0), (0.25, 1), (0.5, 0.4), (0.75, 1), (1, 0)]],
+    "X": [[(0, 0), (1, 1)], [(1, 0), (0, 1)]],
+    "Y": [[(0, 0), (0.5, 0.5), (1, 0)], [(0.5, 0.5), (0.5, 1)]],
+    "Z": [[(0, 0), (1, 0), (0, 1), (1, 1)]],
+}
+
+LETTERS = string.ascii_uppercase
+
+
+def letter_strokes(letter, box, rng=None, jitter=0.0):
+    """Stroke polylines of a letter placed in box = (x, y, width, height)
+    
+    With jitter > 0 the glyph is randomly rotated, sheared and scaled by up
+    to that fraction, the way a hand-drawn letter would be.
+    """
+    x, y, width, height = box
+    rng = rng or np.random.default_rng()
+    angle = rng.uniform(-0.2, 0.2) * jitter
+    shear = rng.uniform(-0.3, 0.3) * jitter
+    scale = 1.0 + rng.uniform(-0.2, 0.2) * jitter
+    cos, sin = np.cos(angle), np.sin(angle)
+    transform = np.array([[cos, -sin], [sin, cos]]) @ np.array([[1, shear], [0, 1]]) * scale
+
+    strokes = []
+    for stroke in LETTER_STROKES[letter]:
+        points = np.array(stroke, dtype=np.float64) - 0.5
+        points = points @ transform.T + 0.5
+        if jitter:
+            points += rng.normal(0, 0.01 * jitter, points.shape)
+        points = points * (width, height) + (x, y)
+        strokes.append(np.round(points).astype(np.int32))
+    return strokes
+
+
+def render_strokes(strokes, size, thickness):
+    """Draw strokes in white on a black single-channel canvas of size (width, height)"""
+    canvas = np.zeros((size[1], size[0]), dtype=np.uint8)
+    cv2.polylines(canvas, [s.reshape(-1, 1, 2) for s in strokes], False, 255, thickness=thickness)
+    return canvas
+
+
+def render_glyph(letter, size=28, margin=4, thickness=2, rng=None, jitter=1.0):
+    """Black-on-white size x size glyph in the layout the model expects"""
+    strokes = letter_strokes(letter, (margin, margin, size - 2 * margin, size - 2 * margin), rng, jitter)
+    return cv2.bitwise_not(render_strokes(strokes, (size, size), thickness))
+
+
+def glyph_set(count, size=28, seed=0):
+    """(images, labels) of count random glyphs cycling through A-Z"""
+    rng = np.random.default_rng(seed)
+    labels = [LETTERS[i % len(LETTERS)] for i in range(count)]
+    images = [render_glyph(label, size=size, thickness=int(rng.integers(1, 3)), rng=rng) for label in labels]
+    return images, labels
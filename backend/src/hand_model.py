@@ -1,53 +1,160 @@
 import cv2
 import numpy as np
-from tensorflow.keras.models import load_model
 import os
+import threading
 base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MODEL_PATH = os.path.join(base_dir, "models", "letter_recognition.h5")
 
+# Batch sizes the direct inference path is traced for; other sizes are
+# chunked and padded up to the nearest one
+TRACED_BATCH_SIZES = (1, 4, 8)
+
+# Available inference backends:
+# - "keras": TensorFlow/Keras model loaded from the .h5 file
+# - "numpy": pure-NumPy engine over memory-mapped weights, no TensorFlow import
+# - "tflite": quantized flatbuffer written by backend.src.quantize
+BACKENDS = ("keras", "numpy", "tflite")
+
+# EMNIST byclass output classes, in model output order
+LABELS = np.array(['0', '1','2','3','4','5','6','7','8','9',
+                   'A','B','C','D','E','F','G','H','I','J','K','L','M','N','O','P','Q','R','S','T','U','V','W','X','Y','Z',
+                   'a','b','c','d','e','f','g','h','i','j','k','l','m','n','o','p','q','r','s','t','u','v','w','x','y','z'])
+
+
+def prepare_batch(images):
+    """Stack 28x28 grayscale images into a normalized (N, 28, 28, 1) tensor"""
+    batch = np.stack([np.asarray(img).reshape(28, 28) for img in images])
+    
+    # Same as thresholding at 200 and inverting: the letter (dark pixels)
+    # becomes 1 and the white background becomes 0, as in EMNIST
+    return (batch <= 200).astype(np.float32).reshape(-1, 28, 28, 1)
+
+
+def top_k_predictions(probabilities, top_k=3):
+    """(labels, confidences) of the top_k classes per row, best first"""
+    if len(probabilities) == 0:
+        return np.empty((0, top_k), dtype=LABELS.dtype), np.empty((0, top_k), dtype=np.float32)
+    
+    # Top-k per row without a full sort
+    top_k = min(top_k, probabilities.shape[1])
+    top_indices = np.argpartition(probabilities, -top_k, axis=1)[:, -top_k:]
+    top_scores = np.take_along_axis(probabilities, top_indices, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    top_indices = np.take_along_axis(top_indices, order, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+    
+    return LABELS[top_indices], top_scores.astype(np.float32)
+
+
+def backend_for_path(model_path):
+    """Guess the backend from the model file: .tflite, an exported directory or .h5"""
+    if model_path.endswith(".tflite"):
+        return "tflite"
+    if os.path.isdir(model_path):
+        return "numpy"
+    return "keras"
+
 
 class HandModel:
-    def __init__(self, model_path=MODEL_PATH):
-        """Initialize the model with the given model path"""
-        self.model = load_model(model_path)
-        self.mapping = ['0', '1','2','3','4','5','6','7','8','9',
-                        'A','B','C','D','E','F','G','H','I','J','K','L','M','N','O','P','Q','R','S','T','U','V','W','X','Y','Z',
-                        'a','b','c','d','e','f','g','h','i','j','k','l','m','n','o','p','q','r','s','t','u','v','w','x','y','z']
+    def __init__(self, model_path=MODEL_PATH, backend=None, direct_inference=True):
+        """Initialize the model with the given model path and inference backend
+        
+        The backend is picked from the model path when not given, so
+        HandModel(model_path="..._int8.tflite") loads the quantized tier.
+        """
+        backend = backend or backend_for_path(model_path)
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+        
+        self.model_path = model_path
+        self.backend = backend
+        
+        if backend == "numpy":
+            from backend.src.numpy_engine import NumpyCNN
+            self.model = NumpyCNN.from_model_path(model_path)
+        elif backend == "tflite":
+            from backend.src.tflite_engine import TFLiteModel
+            self.model = TFLiteModel(model_path)
+        else:
+            from tensorflow.keras.models import load_model
+            self.model = load_model(model_path)
+        
+        self.mapping = list(LABELS)
+        
+        # model.predict is not safe to call from several sessions at once; the
+        # traced functions, the NumPy engine and TFLite (own lock) are
+        self._predict_lock = threading.Lock()
+        
+        # Shape-specialized callables, one per traced batch size
+        self._traced = {}
+        if backend == "keras" and direct_inference:
+            self._trace_model()
     
-    def predict_from_memory(self, image):
-        """Process and predict from an in-memory image (numpy array)"""
-        # EMNIST format preparation:
-        # - Ensure black letter on white background
-        # - Normalize to 0-1 range
+    def _trace_model(self):
+        """Trace the model for fixed input shapes and warm each trace once
+        
+        model.predict builds a data adapter and runs the whole predict loop on
+        every call, which dominates the cost of a single 28x28 image. A concrete
+        function per batch size skips all of that after the first call.
+        """
+        import tensorflow as tf
+        
+        @tf.function
+        def forward(x):
+            return self.model(x, training=False)
         
-        # Add stronger thresholding to ensure clean black/white
-        _, binary = cv2.threshold(image, 200, 255, cv2.THRESH_BINARY)
+        for size in TRACED_BATCH_SIZES:
+            concrete = forward.get_concrete_function(tf.TensorSpec((size, 28, 28, 1), tf.float32))
+            concrete(tf.zeros((size, 28, 28, 1), tf.float32))  # Warm up
+            self._traced[size] = concrete
+    
+    def _forward(self, batch):
+        """Run the network on a prepared (N, 28, 28, 1) batch and return probabilities"""
+        if self.backend != "keras":
+            return self.model(batch)
         
-        # Print unique values to debug
-        unique_values = np.unique(binary)
-        print(f"Unique values in image: {unique_values}")
+        if not self._traced:
+            with self._predict_lock:
+                return np.asarray(self.model.predict(batch, verbose=0))
         
-        # Normalize to 0-1 range (invert so black is 1 and white is 0)
-        # This is often how EMNIST is processed
-        pred_img = 1.0 - (binary / 255.0)
+        max_size = TRACED_BATCH_SIZES[-1]
+        outputs = []
+        for start in range(0, len(batch), max_size):
+            chunk = batch[start:start + max_size]
+            n = len(chunk)
+            size = next(s for s in TRACED_BATCH_SIZES if s >= n)
+            if size > n:
+                # Pad up to the traced shape, the extra rows are dropped below
+                chunk = np.concatenate([chunk, np.zeros((size - n, 28, 28, 1), dtype=np.float32)])
+            outputs.append(self._traced[size](chunk).numpy()[:n])
         
-        # EMNIST expects a specific shape
-        pred_img = pred_img.reshape(1, 28, 28, 1)  # Add batch and channel dimensions
+        return np.concatenate(outputs)
+    
+    def predict_probabilities(self, images):
+        """Class probabilities (N, classes) for N 28x28 images, in one forward pass"""
+        if len(images) == 0:
+            return np.empty((0, len(LABELS)), dtype=np.float32)
+        return self._forward(prepare_batch(images))
+    
+    def predict_batch(self, images, top_k=3):
+        """Predict N 28x28 images with a single forward pass
         
-        # Make prediction
-        predictions = self.model.predict(pred_img)
+        Returns (labels, confidences) where labels is an (N, top_k) array of
+        characters and confidences the matching (N, top_k) probabilities,
+        best prediction first.
+        """
+        return top_k_predictions(self.predict_probabilities(images), top_k)
+    
+    def predict_from_memory(self, image):
+        """Process and predict from an in-memory image (numpy array)"""
+        labels, confidences = self.predict_batch([image])
         
         # Debugging: print top 3 predictions
-        top_3_indices = np.argsort(predictions[0])[-3:][::-1]
         print("Top 3 predictions:")
-        for idx in top_3_indices:
-            print(f"  {self.mapping[idx]}: {predictions[0][idx]:.4f}")
-        
-        predicted_class = np.argmax(predictions, axis=1)[0]
-        prediction = self.mapping[predicted_class]
-        confidence = float(predictions[0][predicted_class])
+        for label, score in zip(labels[0], confidences[0]):
+            print(f"  {label}: {score:.4f}")
         
-        return prediction, confidence
+        return str(labels[0][0]), float(confidences[0][0])
     
     def predict_from_file(self, img_path):
         """Original method to predict from image file"""
@@ -0,0 +1,222 @@
+"""Out-of-process HandModel inference over shared memory
+
+Inference in the Flet server process competes with the camera loop,
+MediaPipe, JPEG encoding and the websocket handlers for the GIL. The pool
+runs the model in separate worker processes instead. Each worker owns two
+shared memory blocks: raw 28x28 uint8 images go in and class probabilities
+come out, so only a batch size crosses the pipe and nothing is pickled.
+Workers that crash are restarted and the request is retried once.
+"""
+import multiprocessing
+import queue
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from backend.src.hand_model import LABELS, MODEL_PATH, top_k_predictions
+
+# Seconds a worker may take to load its model before it is considered dead
+STARTUP_TIMEOUT = 120.0
+
+
+def _attach(name):
+    """Attach to a block created by the parent without taking ownership of it"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13: spawned workers share the parent's resource
+        # tracker, so registering the block again is harmless
+        return shared_memory.SharedMemory(name=name)
+
+
+def _worker_main(model_path, backend, input_name, output_name, max_batch_size, conn):
+    """Worker process loop: load the model, then serve batch sizes from the pipe"""
+    from backend.src.hand_model import HandModel
+
+    input_block = _attach(input_name)
+    output_block = _attach(output_name)
+    images = np.ndarray((max_batch_size, 28, 28), dtype=np.uint8, buffer=input_block.buf)
+    probabilities = np.ndarray((max_batch_size, len(LABELS)), dtype=np.float32, buffer=output_block.buf)
+
+    try:
+        model = HandModel(model_path, backend=backend)
+        conn.send(("ready", None))
+        while True:
+            try:
+                n = conn.recv()
+            except EOFError:
+                break
+            if n is None:
+                break
+            try:
+                probabilities[:n] = model.predict_probabilities(images[:n])
+                conn.send(("ok", n))
+            except Exception as e:
+                conn.send(("error", repr(e)))
+    finally:
+        del images, probabilities
+        input_block.close()
+        output_block.close()
+
+
+class _Worker:
+    """One supervised worker process and its shared memory"""
+
+    def __init__(self, context, model_path, backend, max_batch_size):
+        self.context = context
+        self.model_path = model_path
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.restarts = 0
+
+        self.input_block = shared_memory.SharedMemory(create=True, size=max_batch_size * 28 * 28)
+        self.output_block = shared_memory.SharedMemory(create=True, size=max_batch_size * len(LABELS) * 4)
+        self.images = np.ndarray((max_batch_size, 28, 28), dtype=np.uint8, buffer=self.input_block.buf)
+        self.probabilities = np.ndarray((max_batch_size, len(LABELS)), dtype=np.float32, buffer=self.output_block.buf)
+
+        self.process = None
+        self.conn = None
+        try:
+            self._start()
+        except BaseException:
+            # Spawn error or startup timeout: nothing else will ever free these
+            if self.process is not None and self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+            if self.conn is not None:
+                self.conn.close()
+            self._free_memory()
+            raise
+
+    def _start(self):
+        parent_conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(
+            target=_worker_main,
+            args=(self.model_path, self.backend, self.input_block.name, self.output_block.name,
+                  self.max_batch_size, child_conn),
+            daemon=True,
+        )
+        self.conn = parent_conn
+        try:
+            self.process.start()
+        finally:
+            child_conn.close()
+
+        # Wait for the model to load so failures surface here, not on first use
+        status, _ = self._receive(STARTUP_TIMEOUT)
+        if status != "ready":
+            raise RuntimeError(f"Inference worker failed to start: {status}")
+
+    def _receive(self, timeout=None):
+        """Next message from the worker, ('dead', None) if it exited or timed out"""
+        try:
+            if self.conn.poll(timeout):
+                return self.conn.recv()
+        except (EOFError, OSError):
+            pass
+        return "dead", None
+
+    def restart(self):
+        print(f"Restarting inference worker (exit code {self.process.exitcode})")
+        self.stop()
+        self.restarts += 1
+        self._start()
+
+    def predict(self, images):
+        """Probabilities for at most max_batch_size images"""
+        n = len(images)
+        for attempt in range(2):
+            if not self.process.is_alive():
+                self.restart()
+            self.images[:n] = np.asarray(images, dtype=np.uint8).reshape(n, 28, 28)
+            try:
+                self.conn.send(n)
+            except (BrokenPipeError, OSError):
+                status, message = "dead", None
+            else:
+                # A crash mid-request shows up as EOF on the pipe
+                status, message = self._receive()
+            if status == "ok":
+                return self.probabilities[:n].copy()
+            if status == "error":
+                raise RuntimeError(f"Inference worker error: {message}")
+            self.process.join(timeout=1.0)
+            if attempt == 0:
+                self.restart()
+        raise RuntimeError("Inference worker crashed twice on the same request")
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=2.0)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+    def close(self):
+        self.stop()
+        self._free_memory()
+
+    def _free_memory(self):
+        del self.images, self.probabilities
+        for block in (self.input_block, self.output_block):
+            block.close()
+            block.unlink()
+
+
+class InferenceWorkerPool:
+    """HandModel-compatible predict_batch served by worker processes"""
+
+    def __init__(self, model_path=MODEL_PATH, backend=None, num_workers=1, max_batch_size=32):
+        # Spawned workers start clean instead of inheriting TensorFlow or MediaPipe state
+        context = multiprocessing.get_context("spawn")
+        self.model_path = model_path
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self._workers = []
+        try:
+            for _ in range(num_workers):
+                self._workers.append(_Worker(context, model_path, backend, max_batch_size))
+        except BaseException:
+            # Workers that did start would keep running and hold their shared memory
+            for worker in self._workers:
+                worker.close()
+            raise
+        self._idle = queue.Queue()
+        for worker in self._workers:
+            self._idle.put(worker)
+        self._closed = threading.Event()
+
+    def predict_probabilities(self, images):
+        if self._closed.is_set():
+            raise RuntimeError("Inference worker pool is closed")
+        if len(images) == 0:
+            return np.empty((0, len(LABELS)), dtype=np.float32)
+
+        # A worker serves one request at a time; others wait for the next idle one
+        worker = self._idle.get()
+        try:
+            return np.concatenate([worker.predict(images[i:i + self.max_batch_size])
+                                   for i in range(0, len(images), self.max_batch_size)])
+        finally:
+            self._idle.put(worker)
+
+    def predict_batch(self, images, top_k=3):
+        """Same interface and results as HandModel.predict_batch"""
+        return top_k_predictions(self.predict_probabilities(images), top_k)
+
+    def stats(self):
+        return {"workers": len(self._workers), "restarts": sum(w.restarts for w in self._workers),
+                "idle": self._idle.qsize()}
+
+    def close(self):
+        """Stop the workers and free their shared memory"""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        for worker in self._workers:
+            worker.close()
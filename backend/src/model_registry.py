@@ -0,0 +1,103 @@
+"""Process-wide registry of loaded HandModel instances
+
+Every Flet session used to construct its own HandModel and load the network
+again. Sessions now borrow a shared instance keyed by (model path, backend)
+and give it back when they end; the model is dropped once nobody holds it.
+With batched=True sessions get a RecognitionDispatcher in front of the
+shared model instead, so concurrent requests share forward passes, and with
+workers > 0 the model runs in that many separate inference processes.
+"""
+import os
+import threading
+
+from backend.src.dispatcher import RecognitionDispatcher
+from backend.src.hand_model import HandModel, MODEL_PATH, backend_for_path
+from backend.src.inference_worker import InferenceWorkerPool
+
+
+class _Entry:
+    def __init__(self):
+        self.lock = threading.Lock()  # Held while the model loads
+        self.model = None
+        self.refcount = 0
+
+
+class ModelRegistry:
+    """Thread-safe, reference-counted cache of loaded models"""
+
+    def __init__(self, factory=HandModel):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def _key(self, model_path, backend, batched, workers):
+        model_path = os.path.abspath(model_path)
+        return model_path, backend or backend_for_path(model_path), batched, workers
+
+    def _load(self, key):
+        model_path, backend, batched, workers = key
+        if batched:
+            return RecognitionDispatcher(self.acquire(model_path, backend, workers=workers))
+        if workers:
+            print(f"Starting {workers} {backend} inference worker(s) for {model_path}")
+            return InferenceWorkerPool(model_path, backend, num_workers=workers)
+        print(f"Loading shared {backend} model from {model_path}")
+        return self._factory(model_path, backend=backend)
+
+    def _unload(self, key, model):
+        model_path, backend, batched, workers = key
+        if batched:
+            model.close()
+            print(f"Dispatcher for {model_path} stopped: {model.stats()}")
+            self.release(model.model)
+        elif workers:
+            model.close()
+            print(f"Stopped inference workers for {model_path}")
+        else:
+            print(f"Unloaded shared {backend} model from {model_path}")
+
+    def acquire(self, model_path=MODEL_PATH, backend=None, batched=False, workers=0):
+        """Return the shared model for this path and backend, loading it on first use"""
+        key = self._key(model_path, backend, batched, workers)
+        with self._lock:
+            entry = self._entries.setdefault(key, _Entry())
+            entry.refcount += 1
+
+        # Load outside the registry lock so other models stay available;
+        # concurrent callers for the same key wait for the first load
+        try:
+            with entry.lock:
+                if entry.model is None:
+                    entry.model = self._load(key)
+        except Exception:
+            self._drop(key, entry)
+            raise
+        return entry.model
+
+    def release(self, model):
+        """Give back a model obtained from acquire"""
+        with self._lock:
+            for key, entry in self._entries.items():
+                if entry.model is model:
+                    break
+            else:
+                return
+        self._drop(key, entry)
+
+    def _drop(self, key, entry):
+        with self._lock:
+            entry.refcount -= 1
+            if entry.refcount > 0 or self._entries.get(key) is not entry:
+                return
+            del self._entries[key]
+        if entry.model is not None:
+            self._unload(key, entry.model)
+
+    def stats(self):
+        """Reference count of every loaded model"""
+        with self._lock:
+            return {key: entry.refcount for key, entry in self._entries.items()}
+
+
+# Shared by every session of the server process
+registry = ModelRegistry()
@@ -0,0 +1,253 @@
+"""Pure-NumPy inference engine for the letter recognition CNN
+
+The Keras model is exported once into a directory holding a ``spec.json``
+with the layer configuration and one raw ``.npy`` file per weight tensor.
+Weights are opened with ``mmap_mode="r"`` so several server processes share
+the same pages, and nothing here imports TensorFlow at runtime.
+
+    python -m backend.src.numpy_engine export backend/models/letter_recognition.h5
+    python -m backend.src.numpy_engine verify backend/models/letter_recognition.h5
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+SPEC_FILE = "spec.json"
+
+# Maximum absolute difference allowed between Keras and NumPy probabilities
+TOLERANCE = 1e-4
+
+
+def default_export_dir(model_path):
+    """Directory the weights of a .h5 model are exported to"""
+    return os.path.splitext(model_path)[0] + "_npy"
+
+
+def export_weights(model_path, export_dir=None):
+    """Extract the layer configuration and weights of a Keras model
+    
+    This is the only place that needs TensorFlow and only runs once per model.
+    Returns the export directory.
+    """
+    from tensorflow.keras.models import load_model
+
+    export_dir = export_dir or default_export_dir(model_path)
+    os.makedirs(export_dir, exist_ok=True)
+    model = load_model(model_path)
+
+    layers = []
+    for index, layer in enumerate(model.layers):
+        kind = type(layer).__name__
+        config = layer.get_config()
+        entry = {"type": kind, "name": layer.name}
+
+        if kind in ("InputLayer", "Dropout", "SpatialDropout2D", "GaussianNoise"):
+            continue  # No-ops at inference time
+        elif kind == "Conv2D":
+            if config.get("data_format", "channels_last") != "channels_last":
+                raise ValueError(f"Layer {layer.name}: only channels_last is supported")
+            entry.update(strides=list(config["strides"]), padding=config["padding"],
+                         dilation_rate=list(config["dilation_rate"]), activation=config["activation"])
+        elif kind in ("MaxPooling2D", "AveragePooling2D"):
+            entry.update(pool_size=list(config["pool_size"]), strides=list(config["strides"] or config["pool_size"]),
+                         padding=config["padding"])
+        elif kind == "Dense":
+            entry.update(activation=config["activation"])
+        elif kind == "BatchNormalization":
+            entry.update(epsilon=config["epsilon"], center=config["center"], scale=config["scale"])
+        elif kind == "Activation":
+            entry.update(activation=config["activation"])
+        elif kind == "ReLU":
+            entry.update(type="Activation", activation="relu")
+        elif kind == "Softmax":
+            entry.update(type="Activation", activation="softmax")
+        elif kind != "Flatten":
+            raise ValueError(f"Layer {layer.name}: unsupported layer type {kind}")
+
+        entry["weights"] = []
+        for weight_index, weight in enumerate(layer.get_weights()):
+            filename = f"{index:02d}_{layer.name}_{weight_index}.npy"
+            np.save(os.path.join(export_dir, filename), np.ascontiguousarray(weight, dtype=np.float32))
+            entry["weights"].append(filename)
+        layers.append(entry)
+
+    spec = {
+        "source": os.path.basename(model_path),
+        "input_shape": list(model.input_shape[1:]),
+        "layers": layers,
+    }
+    with open(os.path.join(export_dir, SPEC_FILE), "w") as f:
+        json.dump(spec, f, indent=2)
+
+    print(f"Exported {len(layers)} layers to {export_dir}")
+    return export_dir
+
+
+def _activate(x, activation):
+    if activation in (None, "linear"):
+        return x
+    if activation == "relu":
+        return np.maximum(x, 0, out=x)
+    if activation == "softmax":
+        x = x - x.max(axis=-1, keepdims=True)
+        np.exp(x, out=x)
+        x /= x.sum(axis=-1, keepdims=True)
+        return x
+    if activation == "sigmoid":
+        return 1.0 / (1.0 + np.exp(-x))
+    if activation == "tanh":
+        return np.tanh(x)
+    raise ValueError(f"Unsupported activation: {activation}")
+
+
+def _pad_same(x, window, strides, dilation=(1, 1)):
+    """Zero-pad an NHWC tensor the way TensorFlow does for padding='same'"""
+    pads = [(0, 0)]
+    for size, k, s, d in zip(x.shape[1:3], window, strides, dilation):
+        effective = (k - 1) * d + 1
+        out = -(-size // s)
+        total = max((out - 1) * s + effective - size, 0)
+        pads.append((total // 2, total - total // 2))
+    pads.append((0, 0))
+    return np.pad(x, pads)
+
+
+def _windows(x, window, strides, dilation=(1, 1)):
+    """Strided (N, Ho, Wo, C, kh, kw) view of the sliding windows of an NHWC tensor"""
+    kh, kw = window
+    dh, dw = dilation
+    views = sliding_window_view(x, ((kh - 1) * dh + 1, (kw - 1) * dw + 1), axis=(1, 2))
+    return views[:, ::strides[0], ::strides[1], :, ::dh, ::dw]
+
+
+def conv2d(x, kernel, bias, strides=(1, 1), padding="valid", dilation=(1, 1)):
+    """NHWC convolution as one im2col matrix multiplication"""
+    kh, kw, channels, filters = kernel.shape
+    if padding == "same":
+        x = _pad_same(x, (kh, kw), strides, dilation)
+    windows = _windows(x, (kh, kw), strides, dilation)
+    n, ho, wo = windows.shape[:3]
+
+    # (N, Ho, Wo, kh, kw, C) matches the kernel layout, so the kernel is only reshaped
+    columns = windows.transpose(0, 1, 2, 4, 5, 3).reshape(n * ho * wo, kh * kw * channels)
+    out = columns @ kernel.reshape(kh * kw * channels, filters)
+    if bias is not None:
+        out += bias
+    return out.reshape(n, ho, wo, filters)
+
+
+def pool2d(x, pool_size, strides, padding="valid", reduce="max"):
+    """Max or average pooling over an NHWC tensor"""
+    if padding == "same":
+        # Padded cells must never win a max and are excluded from averages
+        fill = -np.inf if reduce == "max" else np.nan
+        padded = _pad_same(x, pool_size, strides).astype(x.dtype)
+        mask = _pad_same(np.ones_like(x[..., :1], dtype=bool), pool_size, strides)
+        padded[~np.broadcast_to(mask, padded.shape)] = fill
+        x = padded
+    windows = _windows(x, pool_size, strides)
+    if reduce == "max":
+        return windows.max(axis=(4, 5))
+    return np.nanmean(windows, axis=(4, 5))
+
+
+class NumpyCNN:
+    """Sequential CNN evaluated with vectorized NumPy operations"""
+
+    def __init__(self, export_dir):
+        with open(os.path.join(export_dir, SPEC_FILE)) as f:
+            self.spec = json.load(f)
+        self.export_dir = export_dir
+        self.input_shape = tuple(self.spec["input_shape"])
+
+        # Memory-mapped, read-only weights shared between processes
+        self.layers = []
+        for entry in self.spec["layers"]:
+            weights = [np.load(os.path.join(export_dir, name), mmap_mode="r") for name in entry["weights"]]
+            self.layers.append((entry, weights))
+
+    @classmethod
+    def from_model_path(cls, model_path):
+        """Load an export directory, or the export next to a .h5 file
+        
+        The .h5 is exported on first use, which imports TensorFlow once.
+        """
+        if os.path.isdir(model_path):
+            return cls(model_path)
+        export_dir = default_export_dir(model_path)
+        if not os.path.exists(os.path.join(export_dir, SPEC_FILE)):
+            export_weights(model_path, export_dir)
+        return cls(export_dir)
+
+    def __call__(self, batch):
+        """Return the output probabilities for an (N, H, W, C) float32 batch"""
+        x = np.array(batch, dtype=np.float32)  # Activations are applied in place
+        for entry, weights in self.layers:
+            kind = entry["type"]
+            if kind == "Conv2D":
+                bias = weights[1] if len(weights) > 1 else None
+                x = conv2d(x, weights[0], bias, entry["strides"], entry["padding"], entry["dilation_rate"])
+                x = _activate(x, entry["activation"])
+            elif kind == "MaxPooling2D":
+                x = pool2d(x, entry["pool_size"], entry["strides"], entry["padding"], "max")
+            elif kind == "AveragePooling2D":
+                x = pool2d(x, entry["pool_size"], entry["strides"], entry["padding"], "mean")
+            elif kind == "Flatten":
+                x = x.reshape(len(x), -1)
+            elif kind == "Dense":
+                x = x @ weights[0]
+                if len(weights) > 1:
+                    x += weights[1]
+                x = _activate(x, entry["activation"])
+            elif kind == "BatchNormalization":
+                weights = list(weights)
+                gamma = weights.pop(0) if entry["scale"] else 1.0
+                beta = weights.pop(0) if entry["center"] else 0.0
+                mean, variance = weights
+                x = (x - mean) * (gamma / np.sqrt(variance + entry["epsilon"])) + beta
+            elif kind == "Activation":
+                x = _activate(x, entry["activation"])
+        return x
+
+
+def verify(model_path, export_dir=None, samples=64, seed=0):
+    """Compare NumPy and Keras outputs on random binary glyphs
+    
+    Returns the maximum absolute difference and raises if it exceeds TOLERANCE.
+    """
+    from tensorflow.keras.models import load_model
+
+    engine = NumpyCNN(export_dir or default_export_dir(model_path))
+    keras_model = load_model(model_path)
+
+    rng = np.random.default_rng(seed)
+    batch = (rng.random((samples,) + engine.input_shape) > 0.8).astype(np.float32)
+    expected = np.asarray(keras_model(batch, training=False))
+    actual = engine(batch)
+
+    max_diff = float(np.abs(expected - actual).max())
+    agreement = float((expected.argmax(axis=1) == actual.argmax(axis=1)).mean())
+    print(f"Max abs difference: {max_diff:.2e} (tolerance {TOLERANCE:.0e}), top-1 agreement: {agreement:.2%}")
+    if max_diff > TOLERANCE:
+        raise AssertionError(f"NumPy engine differs from Keras by {max_diff:.2e}")
+    return max_diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or verify NumPy weights of a Keras model")
+    parser.add_argument("command", choices=["export", "verify"])
+    parser.add_argument("model_path")
+    parser.add_argument("--export-dir")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_weights(args.model_path, args.export_dir)
+    else:
+        verify(args.model_path, args.export_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""Point-cloud template recognizer for drawn letters, in the style of $P/$Q
+
+Works directly on the stroke points instead of a rasterized canvas: the
+strokes are resampled to a fixed number of points, normalized for position
+and scale, and matched against precomputed A-Z templates with the greedy
+cloud distance of $P (Vatavu, Anthony and Wobbrock, 2012), so stroke order
+and direction do not matter. As in $Q, a cheap nearest-point lower bound is
+computed for all templates at once, on every other point only, and just
+the most promising templates get the full greedy match.
+
+The match score is a template similarity, not a probability. A calibration
+fitted on labeled, really drawn strokes maps score and margin to the
+probability that the match is right:
+
+    python -m backend.src.point_cloud calibrate strokes.jsonl calibration.json
+
+strokes.jsonl holds one {"label": "A", "strokes": [[[x, y], ...], ...]}
+per line, with label null for drawings that are not a letter.
+"""
+import argparse
+import json
+
+import numpy as np
+
+from backend.src.glyphs import LETTERS, letter_strokes
+
+NUM_POINTS = 16
+# The shortlisting lower bound uses every COARSE_STEP-th point of the clouds
+COARSE_STEP = 2
+
+
+def resample(strokes, n=NUM_POINTS):
+    """n points spaced evenly along all strokes, without bridging the gaps between strokes"""
+    strokes = [s for s in strokes if len(s)]
+    if not strokes:
+        return None
+
+    # Cumulative arc length over all strokes, with no length across stroke gaps
+    points = np.concatenate(strokes).astype(np.float64, copy=False).reshape(-1, 2)
+    steps = np.diff(points, axis=0)
+    steps = np.sqrt((steps * steps).sum(axis=1))
+    if len(strokes) > 1:
+        steps[np.cumsum([len(s) for s in strokes[:-1]], dtype=np.intp) - 1] = 0
+    positions = np.empty(len(points))
+    positions[0] = 0.0
+    np.cumsum(steps, out=positions[1:])
+    offset = positions[-1]
+
+    if offset == 0:
+        return np.repeat(points[:1], n, axis=0)
+    # Not np.linspace, which costs more than the interpolation on this few points
+    targets = np.arange(n) * (offset / (n - 1))
+    resampled = np.empty((n, 2))
+    resampled[:, 0] = np.interp(targets, positions, points[:, 0])
+    resampled[:, 1] = np.interp(targets, positions, points[:, 1])
+    return resampled
+
+
+def normalize(points):
+    """Scale to unit size keeping the aspect ratio and center on the centroid"""
+    extent = (points.max(axis=0) - points.min(axis=0)).max()
+    points = points - points.mean(axis=0)
+    if extent:
+        points /= extent
+    return points
+
+
+def to_cloud(strokes, n=NUM_POINTS):
+    cloud = resample(strokes, n)
+    return None if cloud is None else normalize(cloud)
+
+
+def greedy_distances(distances):
+    """Greedy cloud distance for every template, from the best start point
+
+    distances is (T, n, n): distances[t, i, j] between candidate point i and
+    template point j. Every (template, start) pair is one row of the search,
+    so each step of the greedy matching is a single argmin over all of them.
+    Returns (T,).
+    """
+    templates, n = distances.shape[:2]
+    # Start points spaced sqrt(n) apart, as in $P with epsilon = 0.5
+    starts = np.arange(0, n, max(1, int(n ** 0.5)))
+    rows = templates * len(starts)
+    # (n, rows, n), step-major: the candidate point matched at step k of every row
+    order = (starts[:, None] + np.arange(n)[None, :]) % n
+    steps = np.ascontiguousarray(distances[:, order, :].reshape(rows, n, n).transpose(1, 0, 2))
+
+    # Flat buffers reused across steps, every call counts at this size
+    taken = np.zeros(rows * n)
+    row = np.empty((rows, n))
+    matched = np.empty((n, rows))
+    base = np.arange(rows) * n
+    for k in range(n):
+        np.add(steps[k], taken.reshape(rows, n), out=row)
+        picked = row.argmin(axis=1)
+        picked += base
+        matched[k] = row.ravel()[picked]
+        taken[picked] = np.inf
+    # Early points weigh more than late ones, which have fewer choices left
+    weights = 1 - np.arange(n) / n
+    return (weights @ matched).reshape(templates, len(starts)).min(axis=1)
+
+
+class PointCloudRecognizer:
+    """Matches strokes against jittered renderings of the A-Z stroke templates"""
+
+    def __init__(self, templates_per_letter=4, candidates=6, seed=0, n=NUM_POINTS, calibration=None):
+        """
+        calibration: (score weight, margin weight, bias) from fit_calibration,
+            without it confidence() is unknown
+        """
+        self.n = n
+        self.candidates = candidates
+        self.calibration = calibration
+        rng = np.random.default_rng(seed)
+        labels, clouds = [], []
+        for letter in LETTERS:
+            for variant in range(templates_per_letter):
+                # The first template of every letter is the clean stroke template
+                strokes = letter_strokes(letter, (0, 0, 100, 100), rng, jitter=0.0 if variant == 0 else 1.0)
+                labels.append(letter)
+                clouds.append(to_cloud(strokes, n))
+        self.labels = np.array(labels)
+        self.templates = np.stack(clouds)  # (T, n, 2)
+        self._templates_sq = (self.templates ** 2).sum(axis=2)
+        # Coarse clouds for the lower bound, point-major so reductions over
+        # points run across all templates at once
+        coarse = self.templates[:, ::COARSE_STEP]
+        self._coarse_n = coarse.shape[1]
+        self._flat = coarse.transpose(1, 0, 2).reshape(-1, 2)
+        self._flat_sq = (self._flat ** 2).sum(axis=1)
+
+    def _squared_distances(self, points):
+        """(m, m, T) squared distances: [i, j, t] between coarse point i and coarse point j of template t"""
+        # In place: on arrays this small, every temporary costs as much as the product
+        squared = points @ self._flat.T
+        squared *= -2
+        squared += self._flat_sq
+        squared += (points * points).sum(axis=1)[:, None]
+        np.maximum(squared, 0, out=squared)
+        return squared.reshape(self._coarse_n, self._coarse_n, len(self.templates))
+
+    def scores(self, strokes):
+        """Best score in [0, 1] per letter among the matched templates, or None without points"""
+        cloud = to_cloud(strokes, self.n)
+        if cloud is None:
+            return None
+        squared = self._squared_distances(cloud[::COARSE_STEP])
+
+        # Lower bound for both matching directions, taking square roots of the minima only
+        bound = np.minimum(np.sqrt(squared.min(axis=1)).sum(axis=0), np.sqrt(squared.min(axis=0)).sum(axis=0))
+        shortlist = np.argsort(bound)[:self.candidates]
+
+        # Full greedy match on all points for the shortlist, in both directions in one pass
+        candidates = cloud @ self.templates[shortlist].transpose(0, 2, 1)
+        candidates *= -2
+        candidates += self._templates_sq[shortlist][:, None, :]
+        candidates += (cloud * cloud).sum(axis=1)[:, None]
+        np.maximum(candidates, 0, out=candidates)
+        np.sqrt(candidates, out=candidates)
+        both = greedy_distances(np.concatenate([candidates, candidates.transpose(0, 2, 1)]))
+        distances = np.minimum(both[:len(shortlist)], both[len(shortlist):])
+        # A mean point distance of 1 (the size of the letter) or more scores 0
+        scores = np.maximum(1.0 - distances / (self.n / 2), 0.0)
+
+        best = {}
+        for label, score in zip(self.labels[shortlist], scores):
+            best[label] = max(best.get(label, 0.0), float(score))
+        return best
+
+    def recognize(self, strokes):
+        """(letter, score, margin) for the best match, margin being its lead over the runner-up letter"""
+        scores = self.scores(strokes)
+        if not scores:
+            return None, 0.0, 0.0
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        letter, score = ranked[0]
+        margin = score - ranked[1][1] if len(ranked) > 1 else score
+        return letter, score, margin
+
+    def confidence(self, score, margin):
+        """Calibrated probability that a match with this score and margin is right, None if uncalibrated"""
+        if self.calibration is None:
+            return None
+        w_score, w_margin, bias = self.calibration
+        return float(1.0 / (1.0 + np.exp(-(w_score * score + w_margin * margin + bias))))
+
+
+def fit_calibration(scores, margins, correct, iterations=25, l2=1e-3):
+    """Logistic (Platt) fit of P(correct) on score and margin, returns (score weight, margin weight, bias)"""
+    features = np.column_stack([scores, margins, np.ones(len(scores))])
+    target = np.asarray(correct, dtype=np.float64)
+    weights = np.zeros(3)
+    for _ in range(iterations):
+        # Newton steps on the L2-regularized log loss
+        p = 1.0 / (1.0 + np.exp(-features @ weights))
+        gradient = features.T @ (p - target) + l2 * weights
+        hessian = (features * (p * (1 - p))[:, None]).T @ features + l2 * np.eye(3)
+        weights -= np.linalg.solve(hessian, gradient)
+    return tuple(float(w) for w in weights)
+
+
+def load_strokes(path):
+    """(strokes, label) per line of a labeled strokes JSONL file, label None for non-letters"""
+    with open(path) as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [([np.asarray(stroke, dtype=np.float64) for stroke in row["strokes"]], row.get("label")) for row in rows]
+
+
+def load_calibration(path):
+    with open(path) as f:
+        return tuple(json.load(f)["weights"])
+
+
+def calibrate(recognizer, samples):
+    """Fit the calibration of recognizer on (strokes, label) samples, returns it with fit statistics"""
+    scores, margins, correct = [], [], []
+    for strokes, label in samples:
+        letter, score, margin = recognizer.recognize(strokes)
+        scores.append(score)
+        margins.append(margin)
+        correct.append(letter is not None and letter == label)
+    calibration = fit_calibration(scores, margins, correct)
+    return calibration, {"samples": len(samples), "match_accuracy": float(np.mean(correct))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Point-cloud recognizer tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    calibrate_parser = commands.add_parser("calibrate", help="Fit the score calibration on labeled strokes")
+    calibrate_parser.add_argument("strokes", help="JSONL of really drawn, labeled strokes")
+    calibrate_parser.add_argument("output", help="Calibration JSON for RECOGNITION_VECTOR_CALIBRATION")
+    args = parser.parse_args()
+
+    samples = load_strokes(args.strokes)
+    if not samples:
+        raise SystemExit(f"No strokes in {args.strokes}")
+    calibration, stats = calibrate(PointCloudRecognizer(), samples)
+    with open(args.output, "w") as f:
+        json.dump({"weights": calibration, **stats}, f, indent=2)
+    print(f"Calibrated on {stats['samples']} drawings ({stats['match_accuracy']:.1%} matched right), "
+          f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Bounded LRU cache for letter predictions
+
+Drawings from the tracker are keyed by their canvas version and bounds.
+The version changes with every point drawn and on every clear, so a lookup
+needs no preprocessing at all, and recognizing an unchanged drawing again
+costs only the dictionary access. Canvases without a version fall back to
+a digest of their normalized 28x28 model inputs.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class PredictionCache:
+    """Thread-safe LRU mapping of input digests to prediction results"""
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key_for_drawing(canvas_version, drawing_bounds):
+        """Key of a tracker drawing, known before any preprocessing"""
+        return ("drawing", canvas_version, drawing_bounds)
+
+    @staticmethod
+    def key_for(images):
+        """Digest of a stack of images, including its shape"""
+        images = np.ascontiguousarray(images)
+        digest = hashlib.blake2b(images.data, digest_size=16)
+        digest.update(str(images.shape).encode())
+        return digest.digest()
+
+    def get(self, key):
+        """Cached value for key or None, counting the hit or miss"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,186 @@
+"""Canvas preprocessing for letter recognition
+
+Turns the white-on-black drawing canvas into the black-on-white 28x28
+variants the model is run on: the letter is cropped with some padding,
+centered in a square and resized, once as drawn and once each rotated,
+dilated and eroded.
+
+fused_variants does the same work on just the region around the strokes:
+the bounding box comes from the stroke points the tracker already knows,
+the morphology runs on that small ROI only, and the crop, centering,
+rotation and resize of every variant are one affine warp straight to
+28x28. extract_letter_square and build_variants are the original
+full-canvas implementation, kept for comparison.
+"""
+import cv2
+import numpy as np
+
+VARIANT_NAMES = ("Original", "Rotated 90°", "Dilated", "Eroded")
+
+ROI_PADDING = 30
+
+STROKE_THICKNESS = 5  # Same as HandTracker
+
+INPUT_SIZE = 28
+
+# Canvas pixels brighter than this are ink, the inverse of the legacy
+# threshold of 100 on the inverted canvas
+INK_THRESHOLD = 154
+
+
+def extract_letter_square(canvas, padding=ROI_PADDING):
+    """Binary black-on-white square crop centered on the drawing, or None if the canvas is empty"""
+    # Convert the canvas to grayscale for prediction
+    gray_canvas = cv2.cvtColor(canvas, cv2.COLOR_BGR2GRAY) if canvas.ndim == 3 else canvas
+
+    # EMNIST images have black letter on white background, but our canvas has white on black
+    gray_canvas = cv2.bitwise_not(gray_canvas)
+
+    # Use a less aggressive threshold to preserve more detail
+    _, binary = cv2.threshold(gray_canvas, 100, 255, cv2.THRESH_BINARY)
+
+    # Find non-zero pixels for ROI detection
+    y_indices, x_indices = np.where(binary < 255)
+    if len(y_indices) == 0:
+        return None
+
+    # Find the bounds with all non-zero pixels and add padding around the letter
+    x_min = max(0, np.min(x_indices) - padding)
+    y_min = max(0, np.min(y_indices) - padding)
+    x_max = min(binary.shape[1], np.max(x_indices) + padding)
+    y_max = min(binary.shape[0], np.max(y_indices) + padding)
+    if x_max <= x_min or y_max <= y_min:
+        return None
+
+    # Extract the ROI containing the letter
+    letter_roi = binary[y_min:y_max, x_min:x_max]
+
+    # Create a square image with the letter centered
+    max_dim = max(letter_roi.shape[0], letter_roi.shape[1])
+    square_img = np.ones((max_dim, max_dim), dtype=np.uint8) * 255
+    offset_x = (max_dim - letter_roi.shape[1]) // 2
+    offset_y = (max_dim - letter_roi.shape[0]) // 2
+    square_img[offset_y:offset_y + letter_roi.shape[0],
+               offset_x:offset_x + letter_roi.shape[1]] = letter_roi
+    return square_img
+
+
+def normalize_variant(img):
+    """Threshold a 28x28 variant and make sure it is black on white"""
+    _, img = cv2.threshold(img, 180, 255, cv2.THRESH_BINARY)
+    if np.sum(img == 0) >= np.sum(img == 255):
+        img = cv2.bitwise_not(img)
+    return img
+
+
+def build_variants(square_img):
+    """The normalized 28x28 variants of a square crop, in VARIANT_NAMES order"""
+    kernel = np.ones((3, 3), np.uint8)
+    variants = [
+        square_img,
+        cv2.rotate(square_img, cv2.ROTATE_90_CLOCKWISE),
+        cv2.dilate(square_img, kernel, iterations=1),
+        cv2.erode(square_img, kernel, iterations=1),
+    ]
+    return [normalize_variant(cv2.resize(img, (28, 28))) for img in variants]
+
+
+def stroke_bounds(points, thickness=STROKE_THICKNESS):
+    """(x_min, y_min, x_max, y_max) of the canvas area strokes through these points can cover"""
+    points = np.asarray(points).reshape(-1, 2)
+    if len(points) == 0:
+        return None
+    x_min, y_min = points.min(axis=0)
+    x_max, y_max = points.max(axis=0)
+    return grow_bounds((int(x_min), int(y_min), int(x_max), int(y_max)), thickness)
+
+
+def grow_bounds(bounds, margin):
+    x_min, y_min, x_max, y_max = bounds
+    return x_min - margin, y_min - margin, x_max + margin, y_max + margin
+
+
+def ink_bounds(canvas, bounds=None):
+    """Exact (x_min, y_min, x_max, y_max) of the ink, looking only inside bounds when given"""
+    height, width = canvas.shape[:2]
+    x0, y0, x1, y1 = bounds if bounds is not None else (0, 0, width - 1, height - 1)
+    x0, y0, x1, y1 = max(0, x0), max(0, y0), min(width - 1, x1), min(height - 1, y1)
+    if x1 < x0 or y1 < y0:
+        return None
+    region = canvas[y0:y1 + 1, x0:x1 + 1]
+    if region.ndim == 3:
+        region = cv2.cvtColor(region, cv2.COLOR_BGR2GRAY)
+    _, region = cv2.threshold(region, INK_THRESHOLD, 255, cv2.THRESH_BINARY)
+    ink = cv2.findNonZero(region)
+    if ink is None:
+        return None
+    x, y, w, h = cv2.boundingRect(ink)
+    return x0 + x, y0 + y, x0 + x + w - 1, y0 + y + h - 1
+
+
+def _variant_transforms(roi_shape, roi_origin, square_size):
+    """Affine matrices from canvas coordinates to each 28x28 variant, in VARIANT_NAMES order
+
+    Same geometry as the legacy path: the ROI is centered in a square, the
+    square is optionally rotated 90° clockwise and then resized.
+    """
+    roi_h, roi_w = roi_shape
+    x0, y0 = roi_origin
+    offset_x = (square_size - roi_w) // 2
+    offset_y = (square_size - roi_h) // 2
+    to_square = np.array([[1, 0, offset_x - x0], [0, 1, offset_y - y0], [0, 0, 1]], dtype=np.float64)
+    # (x, y) -> (size - 1 - y, x), like cv2.rotate(ROTATE_90_CLOCKWISE)
+    rotate = np.array([[0, -1, square_size - 1], [1, 0, 0], [0, 0, 1]], dtype=np.float64)
+    # Pixel-center aligned scaling, like cv2.resize
+    scale = INPUT_SIZE / square_size
+    resize = np.array([[scale, 0, 0.5 * (scale - 1)], [0, scale, 0.5 * (scale - 1)], [0, 0, 1]])
+
+    straight = (resize @ to_square)[:2]
+    rotated = (resize @ rotate @ to_square)[:2]
+    return straight, rotated, straight, straight
+
+
+def fused_variants(canvas, bounds=None, padding=ROI_PADDING):
+    """The normalized 28x28 variants of a white-on-black canvas, touching only the drawing's region
+
+    bounds: optional (x_min, y_min, x_max, y_max) known to contain all ink,
+        e.g. from stroke_bounds; the whole canvas is searched otherwise
+    Returns None when nothing is drawn.
+    """
+    ink = ink_bounds(canvas, bounds)
+    if ink is None:
+        return None
+    height, width = canvas.shape[:2]
+    x_min, y_min = max(0, ink[0] - padding), max(0, ink[1] - padding)
+    x_max, y_max = min(width, ink[2] + padding), min(height, ink[3] + padding)
+    if x_max <= x_min or y_max <= y_min:
+        return None
+
+    # Grayscale and threshold the ROI only, one pixel larger for the morphology
+    gx0, gy0 = max(0, x_min - 1), max(0, y_min - 1)
+    gx1, gy1 = min(width, x_max + 1), min(height, y_max + 1)
+    region = canvas[gy0:gy1, gx0:gx1]
+    if region.ndim == 3:
+        region = cv2.cvtColor(region, cv2.COLOR_BGR2GRAY)
+    _, region = cv2.threshold(region, INK_THRESHOLD, 255, cv2.THRESH_BINARY)
+
+    # White ink on black, so the legacy dilation of the black-on-white square is an erosion here
+    kernel = np.ones((3, 3), np.uint8)
+    sources = (region, region, cv2.erode(region, kernel), cv2.dilate(region, kernel))
+
+    transforms = _variant_transforms((y_max - y_min, x_max - x_min), (x_min - gx0, y_min - gy0),
+                                     max(y_max - y_min, x_max - x_min))
+    variants = []
+    for source, matrix in zip(sources, transforms):
+        warped = cv2.warpAffine(source, matrix, (INPUT_SIZE, INPUT_SIZE), flags=cv2.INTER_LINEAR,
+                                borderMode=cv2.BORDER_CONSTANT, borderValue=0)
+        variants.append(normalize_variant(cv2.bitwise_not(warped)))
+    return variants
+
+
+def prepare_variants(canvas, bounds=None):
+    """All model inputs for a drawing canvas, or None when nothing is drawn
+
+    bounds: optional area known to contain the whole drawing, see fused_variants
+    """
+    return fused_variants(canvas, bounds)
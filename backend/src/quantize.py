@@ -0,0 +1,67 @@
+"""Post-training quantization of the letter recognition model
+
+Converts the Keras model to a TFLite flatbuffer with float16 weights or
+full int8 weights and activations. The int8 calibration runs on glyphs
+rendered locally from the stroke templates in ``glyphs``, so no dataset
+download is needed.
+
+    python -m backend.src.quantize backend/models/letter_recognition.h5 --mode int8
+"""
+import argparse
+import os
+
+from backend.src.glyphs import glyph_set
+from backend.src.hand_model import prepare_batch
+
+MODES = ("float16", "int8")
+
+
+def quantized_path(model_path, mode):
+    """Default location of the quantized variant of a model"""
+    return f"{os.path.splitext(model_path)[0]}_{mode}.tflite"
+
+
+def calibration_batches(samples=512, seed=0):
+    """Yield single normalized glyphs the way HandModel feeds the network"""
+    images, _ = glyph_set(samples, seed=seed)
+    for image in images:
+        yield [prepare_batch([image])]
+
+
+def convert(model_path, mode="int8", output_path=None, samples=512):
+    """Write a quantized .tflite next to the Keras model and return its path"""
+    if mode not in MODES:
+        raise ValueError(f"Unknown quantization mode '{mode}', expected one of {MODES}")
+
+    import tensorflow as tf
+    from tensorflow.keras.models import load_model
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(load_model(model_path))
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if mode == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    else:
+        # Full integer kernels, float input/output so callers stay unchanged
+        converter.representative_dataset = lambda: calibration_batches(samples)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+
+    output_path = output_path or quantized_path(model_path, mode)
+    with open(output_path, "wb") as f:
+        f.write(converter.convert())
+
+    print(f"Wrote {mode} model to {output_path} ({os.path.getsize(output_path) / 1024:.0f} KiB)")
+    return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantize the letter recognition model")
+    parser.add_argument("model_path")
+    parser.add_argument("--mode", choices=MODES, default="int8")
+    parser.add_argument("--output")
+    parser.add_argument("--samples", type=int, default=512, help="Calibration glyphs for int8")
+    args = parser.parse_args()
+    convert(args.model_path, args.mode, args.output, args.samples)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Confidence-driven cascade for letter recognition
+
+Running every preprocessing variant through the full CNN is wasted work
+when the drawing as-is is already recognized with high confidence. The
+policy tries the variants in a configurable order and stops as soon as one
+clears the early-exit threshold. An optional fast model tier, e.g. the
+int8 TFLite model, is tried first and only escalates to the full CNN when
+it is unsure. Cheaper still, an optional vector tier matches the raw
+strokes against point-cloud templates before anything is rasterized, and
+only matches whose calibrated confidence is high are accepted without the
+CNN.
+"""
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from backend.src.preprocessing import VARIANT_NAMES
+
+
+@dataclass
+class RecognitionResult:
+    """Outcome of one recognition request"""
+    prediction: Optional[str]
+    confidence: float
+    tier: str  # "vector", "fast" or "full"
+    variants_used: int
+
+
+class RecognitionPolicy:
+    def __init__(self, variant_order=VARIANT_NAMES, early_exit_confidence=0.9,
+                 fast_model=None, fast_accept_confidence=0.95,
+                 vector_recognizer=None, vector_accept_confidence=0.95):
+        """
+        variant_order: names from VARIANT_NAMES, most promising first
+        early_exit_confidence: stop once a variant reaches this confidence,
+            None always runs every variant
+        fast_model: optional cheaper model with the predict_batch interface
+        fast_accept_confidence: fast model results below this go to the full model
+        vector_recognizer: optional calibrated PointCloudRecognizer for recognize_strokes
+        vector_accept_confidence: vector results whose calibrated confidence is
+            below this go to the CNN
+        """
+        unknown = set(variant_order) - set(VARIANT_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown variants: {sorted(unknown)}")
+        self.variant_order = [VARIANT_NAMES.index(name) for name in variant_order]
+        self.early_exit_confidence = early_exit_confidence
+        self.fast_model = fast_model
+        self.fast_accept_confidence = fast_accept_confidence
+        self.vector_recognizer = vector_recognizer
+        self.vector_accept_confidence = vector_accept_confidence
+
+        # (tier, variants used) -> requests; sessions and their background
+        # recognizers update it concurrently
+        self._stats_lock = threading.Lock()
+        self.tier_counts = Counter()
+
+    def _best(self, model, images):
+        labels, confidences = model.predict_batch(images, top_k=1)
+        best = int(np.argmax(confidences[:, 0]))
+        return str(labels[best, 0]), float(confidences[best, 0])
+
+    def _count(self, tier, variants_used):
+        with self._stats_lock:
+            self.tier_counts[(tier, variants_used)] += 1
+
+    def stats(self):
+        """Requests per (tier, variants used)"""
+        with self._stats_lock:
+            return dict(self.tier_counts)
+
+    def _finish(self, prediction, confidence, tier, variants_used):
+        self._count(tier, variants_used)
+        print(f"Recognized {prediction} ({confidence:.4f}) with the {tier} model after {variants_used} variant(s)")
+        return RecognitionResult(prediction, confidence, tier, variants_used)
+
+    def recognize_strokes(self, strokes):
+        """Vector tier: a RecognitionResult when the strokes match a template clearly, otherwise None
+
+        Meant to run before the canvas is preprocessed, so a clear match
+        costs neither the variants nor a forward pass. The result carries the
+        calibrated confidence, never the raw template score; without a
+        calibration everything is deferred.
+        """
+        if self.vector_recognizer is None or not strokes:
+            return None
+        letter, score, margin = self.vector_recognizer.recognize(strokes)
+        confidence = self.vector_recognizer.confidence(score, margin)
+        if letter is None or confidence is None or confidence < self.vector_accept_confidence:
+            self._count("vector", "deferred")
+            return None
+        return self._finish(letter, confidence, "vector", 0)
+
+    def recognize(self, model, variants):
+        """Recognize a letter from its preprocessing variants (in VARIANT_NAMES order)"""
+        ordered = [variants[i] for i in self.variant_order]
+        if not ordered:
+            return RecognitionResult(None, 0.0, "full", 0)
+
+        # Fast tier: one pass of the cheap model on the most promising variant
+        if self.fast_model is not None:
+            prediction, confidence = self._best(self.fast_model, ordered[:1])
+            if confidence >= self.fast_accept_confidence:
+                return self._finish(prediction, confidence, "fast", 1)
+
+        if self.early_exit_confidence is None:
+            return self._finish(*self._best(model, ordered), "full", len(ordered))
+
+        # Full tier: the first variant alone, the rest in a single batch only if needed
+        prediction, confidence = self._best(model, ordered[:1])
+        if confidence >= self.early_exit_confidence or len(ordered) == 1:
+            return self._finish(prediction, confidence, "full", 1)
+
+        rest_prediction, rest_confidence = self._best(model, ordered[1:])
+        if rest_confidence > confidence:
+            prediction, confidence = rest_prediction, rest_confidence
+        return self._finish(prediction, confidence, "full", len(ordered))
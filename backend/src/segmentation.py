@@ -0,0 +1,151 @@
+"""Multi-letter canvas segmentation
+
+Splits a drawing holding several letters into per-letter regions and
+classifies them all in one batched forward pass.
+
+HandTracker records the path as one array of points and draws a segment
+between every pair of consecutive points, so letters drawn one after the
+other end up joined on the canvas by the jump between them. The path is
+therefore split into strokes wherever two consecutive points are further
+apart than a pen would move in one frame. Strokes whose horizontal extents
+overlap are grouped into one letter, and each group is re-rendered on its
+own without the connecting jumps. Without a path, connected components of
+the canvas are used and merged the same way.
+
+Every region image keeps ROI_PADDING of empty canvas around its letter,
+as far as the canvas reaches, so prepare_variants frames a segmented
+letter exactly like the same letter drawn alone.
+"""
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+from backend.src.preprocessing import ROI_PADDING, prepare_variants
+
+# A jump of more than this many canvas pixels between consecutive path
+# points is taken as the pen being lifted
+STROKE_GAP = 40
+
+# Strokes closer than this horizontally belong to the same letter
+LETTER_GAP = 10
+
+STROKE_THICKNESS = 5  # Same as HandTracker
+
+
+@dataclass
+class LetterRegion:
+    """One letter found on the canvas"""
+    bbox: Tuple[int, int, int, int]  # x_min, y_min, x_max, y_max
+    image: np.ndarray  # White-on-black crop of just this letter, with ROI_PADDING around it
+    strokes: List[np.ndarray] = field(default_factory=list)
+
+
+def split_strokes(drawing_path, max_gap=STROKE_GAP):
+    """Split a path of (x, y) points into strokes at pen-lift jumps"""
+    points = np.asarray(drawing_path, dtype=np.int32).reshape(-1, 2)
+    if len(points) == 0:
+        return []
+    jumps = np.hypot(*np.diff(points, axis=0).T) > max_gap
+    return np.split(points, np.flatnonzero(jumps) + 1)
+
+
+def _group_by_x(extents, letter_gap=LETTER_GAP):
+    """Group items whose [x_min, x_max] ranges overlap or nearly touch, left to right"""
+    groups = []
+    for index in sorted(range(len(extents)), key=lambda i: extents[i][0]):
+        x_min, x_max = extents[index]
+        if groups and x_min <= groups[-1][1] + letter_gap:
+            groups[-1][1] = max(groups[-1][1], x_max)
+            groups[-1][2].append(index)
+        else:
+            groups.append([x_min, x_max, [index]])
+    return [members for _, _, members in groups]
+
+
+def _bbox(points, margin, shape):
+    x_min, y_min = points.min(axis=0) - margin
+    x_max, y_max = points.max(axis=0) + margin + 1
+    return (max(0, int(x_min)), max(0, int(y_min)), min(shape[1], int(x_max)), min(shape[0], int(y_max)))
+
+
+def _padded(bbox, shape, padding=ROI_PADDING):
+    x_min, y_min, x_max, y_max = bbox
+    return max(0, x_min - padding), max(0, y_min - padding), min(shape[1], x_max + padding), min(shape[0], y_max + padding)
+
+
+def regions_from_path(drawing_path, canvas_shape, thickness=STROKE_THICKNESS,
+                      max_gap=STROKE_GAP, letter_gap=LETTER_GAP):
+    """Letter regions re-rendered from the strokes of the drawing path"""
+    strokes = [s for s in split_strokes(drawing_path, max_gap) if len(s)]
+    groups = _group_by_x([(s[:, 0].min(), s[:, 0].max()) for s in strokes], letter_gap)
+
+    regions = []
+    for members in groups:
+        letter_strokes = [strokes[i] for i in members]
+        bbox = _bbox(np.concatenate(letter_strokes), thickness, canvas_shape)
+        x_min, y_min, x_max, y_max = _padded(bbox, canvas_shape)
+        image = np.zeros((y_max - y_min, x_max - x_min), dtype=np.uint8)
+        offset = np.array([x_min, y_min], dtype=np.int32)
+        for stroke in letter_strokes:
+            if len(stroke) == 1:
+                cv2.circle(image, tuple(int(v) for v in stroke[0] - offset), thickness // 2, 255, -1)
+            else:
+                cv2.polylines(image, [(stroke - offset).reshape(-1, 1, 2)], False, 255, thickness=thickness)
+        regions.append(LetterRegion(bbox, image, letter_strokes))
+    return regions
+
+
+def regions_from_canvas(canvas, letter_gap=LETTER_GAP):
+    """Letter regions from the connected components of the canvas"""
+    gray = cv2.cvtColor(canvas, cv2.COLOR_BGR2GRAY) if canvas.ndim == 3 else canvas
+    _, binary = cv2.threshold(gray, 100, 255, cv2.THRESH_BINARY)
+    count, labels, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+
+    # Label 0 is the background
+    components = range(1, count)
+    extents = [(stats[i, cv2.CC_STAT_LEFT], stats[i, cv2.CC_STAT_LEFT] + stats[i, cv2.CC_STAT_WIDTH] - 1)
+               for i in components]
+
+    regions = []
+    for members in _group_by_x(extents, letter_gap):
+        ids = [components[i] for i in members]
+        x_min = min(stats[i, cv2.CC_STAT_LEFT] for i in ids)
+        y_min = min(stats[i, cv2.CC_STAT_TOP] for i in ids)
+        x_max = max(stats[i, cv2.CC_STAT_LEFT] + stats[i, cv2.CC_STAT_WIDTH] for i in ids)
+        y_max = max(stats[i, cv2.CC_STAT_TOP] + stats[i, cv2.CC_STAT_HEIGHT] for i in ids)
+        px_min, py_min, px_max, py_max = _padded((x_min, y_min, x_max, y_max), canvas.shape)
+        mask = np.isin(labels[py_min:py_max, px_min:px_max], ids)
+        regions.append(LetterRegion((x_min, y_min, x_max, y_max), np.where(mask, 255, 0).astype(np.uint8)))
+    return regions
+
+
+def segment_letters(canvas, drawing_path=None):
+    """Per-letter regions of the drawing, ordered left to right"""
+    if drawing_path is not None and len(drawing_path):
+        return regions_from_path(drawing_path, canvas.shape[:2])
+    return regions_from_canvas(canvas)
+
+
+def recognize_sequence(model, canvas, drawing_path=None):
+    """Classify every letter on the canvas with a single forward pass
+    
+    Each region contributes all of its preprocessing variants to the batch and
+    keeps its most confident one. Returns a list of (letter, confidence).
+    """
+    variants = []
+    for region in segment_letters(canvas, drawing_path):
+        batch = prepare_variants(region.image)
+        if batch is not None:
+            variants.append(batch)
+    if not variants:
+        return []
+
+    per_region = len(variants[0])
+    labels, confidences = model.predict_batch([img for group in variants for img in group], top_k=1)
+    labels = labels[:, 0].reshape(-1, per_region)
+    confidences = confidences[:, 0].reshape(-1, per_region)
+    best = confidences.argmax(axis=1)
+    rows = np.arange(len(best))
+    return [(str(label), float(confidence)) for label, confidence in zip(labels[rows, best], confidences[rows, best])]
@@ -0,0 +1,102 @@
+"""Speculative background recognition while the user is still drawing
+
+The camera loop reports every canvas change. A background thread
+recognizes the latest canvas once the drawing has been still for a moment,
+at most once per interval, and keeps the result keyed to the canvas
+version it was computed for. An explicit recognition request for the same
+version can then return immediately.
+"""
+import threading
+import time
+
+
+class SpeculativeRecognizer:
+    def __init__(self, recognize, min_interval=0.3, settle_time=0.3, on_result=None):
+        """
+        recognize: callable(*inputs) -> (prediction, confidence), inputs as given to notify
+        min_interval: minimum seconds between two background recognitions
+        settle_time: seconds without canvas changes before recognizing
+        on_result: optional callable(version, prediction, confidence) for live guesses
+        """
+        self.recognize = recognize
+        self.min_interval = min_interval
+        self.settle_time = settle_time
+        self.on_result = on_result
+
+        self._condition = threading.Condition()
+        self._pending = None  # (version, inputs) not recognized yet
+        self._changed_at = 0.0
+        self._last_run = 0.0
+        self._result = None  # (version, prediction, confidence)
+        self._stopped = False
+
+        self.runs = 0
+        self.hits = 0
+
+        self._thread = threading.Thread(target=self._run, name="speculative-recognition", daemon=True)
+        self._thread.start()
+
+    def notify(self, version, *inputs):
+        """Report the current canvas and whatever else recognize needs; none of it may be modified afterwards"""
+        with self._condition:
+            if self._pending is not None and self._pending[0] == version:
+                return
+            if self._result is not None and self._result[0] == version:
+                return
+            self._pending = (version, inputs)
+            self._changed_at = time.monotonic()
+            self._condition.notify()
+
+    def result_for(self, version):
+        """(prediction, confidence) computed for exactly this canvas version, or None"""
+        with self._condition:
+            if self._result is not None and self._result[0] == version:
+                self.hits += 1
+                return self._result[1:]
+        return None
+
+    def reset(self):
+        """Forget pending work and results, e.g. after the canvas was cleared"""
+        with self._condition:
+            self._pending = None
+            self._result = None
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self._thread.join(timeout=1.0)
+
+    def _next_job(self):
+        """Wait until a pending canvas has settled and the throttle allows a run"""
+        with self._condition:
+            while not self._stopped:
+                if self._pending is None:
+                    self._condition.wait()
+                    continue
+                now = time.monotonic()
+                ready_at = max(self._changed_at + self.settle_time, self._last_run + self.min_interval)
+                if now >= ready_at:
+                    job, self._pending = self._pending, None
+                    self._last_run = now
+                    return job
+                self._condition.wait(ready_at - now)
+        return None
+
+    def _run(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                break
+            version, inputs = job
+            try:
+                prediction, confidence = self.recognize(*inputs)
+            except Exception as e:
+                print(f"Speculative recognition error: {e}")
+                continue
+            self.runs += 1
+            with self._condition:
+                # A newer canvas may already be waiting; the result is still valid for its version
+                self._result = (version, prediction, confidence)
+            if self.on_result and prediction is not None:
+                self.on_result(version, prediction, confidence)
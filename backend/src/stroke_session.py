@@ -0,0 +1,65 @@
+"""Pen-up detection: decide when a drawn letter is finished
+
+HandTracker reports every frame whether the user is drawing and whether a
+hand is visible. The detector watches those results and fires once per
+letter, either after the user stopped drawing for idle_timeout seconds or
+after no hand was seen for hand_lost_timeout seconds. The hand timeout is
+measured in time rather than frames, so that a short MediaPipe dropout
+does not submit a half-drawn letter.
+"""
+import time
+
+
+class StrokeSessionDetector:
+    def __init__(self, idle_timeout=1.2, on_letter_finished=None, hand_lost_timeout=1.5, clock=time.monotonic):
+        """
+        idle_timeout: seconds without drawing after which the letter is finished
+        on_letter_finished: callable(canvas_version) fired once per finished letter
+        hand_lost_timeout: seconds without a hand that also finish the letter,
+            None to only use the idle timeout
+        clock: time source, replaced by a playback clock for recorded sessions
+        """
+        self.idle_timeout = idle_timeout
+        self.on_letter_finished = on_letter_finished
+        self.hand_lost_timeout = hand_lost_timeout
+        self.clock = clock
+
+        self._version = None  # Canvas version last seen
+        self._finished_version = None  # Canvas version the last letter was finished at
+        self._last_activity = None
+        self._hand_lost_at = None  # Since when no hand is seen, None while one is
+
+    def reset(self):
+        """Forget the letter in progress, e.g. after the canvas was cleared"""
+        self._version = None
+        self._finished_version = None
+        self._last_activity = None
+        self._hand_lost_at = None
+
+    def update(self, result):
+        """Feed one HandTrackingResult, returns True if it finished a letter"""
+        now = self.clock()
+        if result.canvas_version != self._version or result.is_drawing:
+            self._version = result.canvas_version
+            self._last_activity = now
+        if result.hand_detected:
+            self._hand_lost_at = None
+        elif self._hand_lost_at is None:
+            self._hand_lost_at = now
+
+        # Nothing drawn since the last finished letter (or since clearing)
+        if len(result.drawing_path) == 0 or self._version == self._finished_version:
+            return False
+
+        hand_gone = (self.hand_lost_timeout is not None and self._hand_lost_at is not None
+                     and now - self._hand_lost_at >= self.hand_lost_timeout)
+        idle = not result.is_drawing and now - self._last_activity >= self.idle_timeout
+        if not (hand_gone or idle):
+            return False
+
+        self._finished_version = self._version
+        reason = "hand left the frame" if hand_gone else f"idle for {now - self._last_activity:.1f}s"
+        print(f"Letter finished ({reason})")
+        if self.on_letter_finished:
+            self.on_letter_finished(self._version)
+        return True
@@ -0,0 +1,62 @@
+"""TensorFlow Lite inference for quantized letter recognition models
+
+The interpreter comes from the standalone LiteRT runtime when it is
+installed, so CPU-only servers can run quantized models without the full
+TensorFlow package; otherwise it falls back to ``tf.lite``.
+"""
+import threading
+
+import numpy as np
+
+
+def _interpreter_class():
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+class TFLiteModel:
+    """Callable wrapper around a .tflite flatbuffer"""
+
+    def __init__(self, model_path, num_threads=None):
+        self.interpreter = _interpreter_class()(model_path=model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch_size = int(self._input["shape"][0])
+
+        # The interpreter keeps its tensors internally and is not thread-safe
+        self._lock = threading.Lock()
+
+    def _quantize(self, batch, details):
+        scale, zero_point = details["quantization"]
+        if details["dtype"] == np.float32 or scale == 0:
+            return batch.astype(details["dtype"])
+        info = np.iinfo(details["dtype"])
+        return np.clip(np.round(batch / scale + zero_point), info.min, info.max).astype(details["dtype"])
+
+    def _dequantize(self, output, details):
+        scale, zero_point = details["quantization"]
+        if details["dtype"] == np.float32 or scale == 0:
+            return output.astype(np.float32)
+        return (output.astype(np.float32) - zero_point) * scale
+
+    def __call__(self, batch):
+        """Return the output probabilities for an (N, 28, 28, 1) float32 batch"""
+        with self._lock:
+            if len(batch) != self._batch_size:
+                self.interpreter.resize_tensor_input(self._input["index"], [len(batch)] + list(self._input["shape"][1:]))
+                self.interpreter.allocate_tensors()
+                self._input = self.interpreter.get_input_details()[0]
+                self._output = self.interpreter.get_output_details()[0]
+                self._batch_size = len(batch)
+
+            self.interpreter.set_tensor(self._input["index"], self._quantize(batch, self._input))
+            self.interpreter.invoke()
+            return self._dequantize(self.interpreter.get_tensor(self._output["index"]), self._output)
@@ -1,20 +1,127 @@
+import math
+import threading
+import time
+
 import cv2
 import mediapipe as mp
 import numpy as np
-from dataclasses import dataclass
-from typing import List, Tuple, Optional
+from dataclasses import dataclass, field
+from typing import Callable, Tuple, Optional
 
 @dataclass
 class HandTrackingResult:
     """Store hand tracking results"""
     index_finger_tip: Tuple[float, float]  # x, y coordinates
-    drawing_path: List[Tuple[float, float]]  # List of points in the path
+    drawing_path: np.ndarray  # Read-only (n, 2) int32 points of the path
     is_drawing: bool
-    canvas: Optional[np.ndarray] = None  # Drawing canvas
+    canvas_version: int = 0  # Changes whenever the canvas content changes
+    hand_detected: bool = False  # Whether a hand was found in this frame
+    drawing_bounds: Optional[Tuple[int, int, int, int]] = None  # x_min, y_min, x_max, y_max of the path points
+    dirty_rect: Optional[Tuple[int, int, int, int]] = None  # Canvas area changed since the previous result, same layout
+    hand_landmarks: Optional[list] = None  # MediaPipe landmarks per hand, None when not detected on this frame
+    canvas_source: Optional[Callable[[int], Optional[np.ndarray]]] = field(default=None, repr=False, compare=False)
+    
+    @property
+    def canvas(self) -> Optional[np.ndarray]:
+        """Read-only drawing canvas at canvas_version, single channel, white strokes on black
+        
+        Taken from the tracker on first access, so a frame whose canvas nobody
+        looks at costs no copy-on-write. None if the drawing has changed
+        since this result, e.g. it was cleared.
+        """
+        if "_canvas" not in self.__dict__:
+            self._canvas = self.canvas_source(self.canvas_version) if self.canvas_source else None
+        return self._canvas
+
+class PathBuffer:
+    """Growable array of (x, y) points
+    
+    Points are only ever appended and growing moves them to a new array, so
+    a view of the first n points never changes while someone holds it.
+    """
+    def __init__(self, capacity=256):
+        self._points = np.empty((capacity, 2), dtype=np.int32)
+        self._length = 0
+    
+    def __len__(self):
+        return self._length
+    
+    def append(self, point):
+        if self._length == len(self._points):
+            grown = np.empty((2 * len(self._points), 2), dtype=np.int32)
+            grown[:self._length] = self._points[:self._length]
+            self._points = grown
+        self._points[self._length] = point
+        self._length += 1
+    
+    def point(self, index):
+        """Point as an (x, y) tuple of ints, as cv2 drawing functions want it"""
+        x, y = self._points[:self._length][index]
+        return int(x), int(y)
+    
+    def view(self):
+        """Read-only (n, 2) view of the points so far"""
+        view = self._points[:self._length]
+        view.flags.writeable = False
+        return view
+
+class FingertipPredictor:
+    """Constant-velocity prediction of fingertip positions between detections
+    
+    An alpha-beta filter with alpha = 1: positions are taken as measured and
+    only the velocity is smoothed over detections, so a noisy landmark does
+    not throw the predictions far off.
+    """
+    def __init__(self, velocity_smoothing=0.6, max_horizon=8):
+        """
+        velocity_smoothing: weight of the latest measured velocity, 1 uses it as is
+        max_horizon: frames after the last detection beyond which nothing is predicted
+        """
+        self.velocity_smoothing = velocity_smoothing
+        self.max_horizon = max_horizon
+        self.reset()
+    
+    def reset(self):
+        self._position = None
+        self._velocity = None
+        self._frame = None
+    
+    def update(self, position, frame):
+        """Record a detected position at a frame number"""
+        position = np.asarray(position, dtype=np.float64)
+        if self._position is not None and frame > self._frame:
+            measured = (position - self._position) / (frame - self._frame)
+            if self._velocity is None:
+                self._velocity = measured
+            else:
+                self._velocity += self.velocity_smoothing * (measured - self._velocity)
+        self._position = position
+        self._frame = frame
+    
+    def predict(self, frame):
+        """Expected position at a later frame number, or None without a recent detection"""
+        if self._position is None or frame - self._frame > self.max_horizon:
+            return None
+        if self._velocity is None:
+            return self._position
+        return self._position + self._velocity * (frame - self._frame)
 
 class HandTracker:
-    def __init__(self, max_hands=1, min_detection_confidence=0.7, min_tracking_confidence=0.7):
-        """Initialize the hand tracker with MediaPipe"""
+    def __init__(self, max_hands=1, min_detection_confidence=0.7, min_tracking_confidence=0.7,
+                 roi_tracking=False, roi_margin=0.6, roi_input_size=256,
+                 detect_every=1, detect_budget_ms=None, max_detect_every=4):
+        """Initialize the hand tracker with MediaPipe
+        
+        roi_tracking: once a hand was found, only process a box around its last
+            landmarks, and go back to the full frame when it is lost there
+        roi_margin: the box extends this fraction of the hand's size on every side
+        roi_input_size: the box is scaled to this many pixels a side for MediaPipe
+        detect_every: run MediaPipe on every Nth frame only and predict the
+            fingertips on the frames in between
+        detect_budget_ms: when set, pick detect_every from the measured cost of a
+            detection so that detection averages at most this much per frame
+        max_detect_every: upper limit for the adaptive detect_every
+        """
         self.mp_hands = mp.solutions.hands
         self.mp_drawing = mp.solutions.drawing_utils
         self.mp_drawing_styles = mp.solutions.drawing_styles
@@ -28,117 +135,353 @@ class HandTracker:
         )
         
         # Drawing parameters
-        self.drawing_path = []
+        self._path = PathBuffer()
         self.is_drawing = False
         self.draw_cooldown = 0
         self.canvas = None
         self.canvas_size = (400, 400)  # Size of the drawing canvas
+        self.stroke_thickness = 5
+        self.canvas_version = 0  # Bumped on every new point and on clear
+        self.drawing_bounds = None  # Grown with every new point, so nobody has to scan the canvas
+        self._dirty_rect = None  # Canvas area changed since the last result
         
-    def process_frame(self, frame: np.ndarray) -> Tuple[np.ndarray, HandTrackingResult]:
-        """Process a single frame and track hands"""
-        # Convert the BGR image to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, _ = frame.shape
+        # Snapshots are read-only views of the canvas; it is copied before the
+        # next drawing only when one was handed out since the last copy. The
+        # lock guards the path, canvas, version and bounds together, so a clear
+        # from the UI thread can never interleave with drawing a segment.
+        self._canvas_shared = False
+        self._canvas_lock = threading.Lock()
         
-        # Initialize or reset canvas if needed - BLACK background
-        if self.canvas is None:
-            self.canvas = np.zeros((self.canvas_size[1], self.canvas_size[0], 3), dtype=np.uint8)
+        # Region-of-interest tracking around the last detected hand
+        self.roi_tracking = roi_tracking
+        self.roi_margin = roi_margin
+        self.roi_input_size = roi_input_size
+        self._roi = None  # x_min, y_min, size of a square in frame pixels, may extend past the frame
+        self.roi_hits = 0
+        self.roi_misses = 0
         
-        # Process the frame with MediaPipe
-        results = self.hands.process(rgb_frame)
+        # Detection decimation, with fingertips predicted in between
+        self.detect_every = detect_every
+        self.detect_budget_ms = detect_budget_ms
+        self.max_detect_every = max_detect_every
+        self.predictor = FingertipPredictor(max_horizon=2 * max(detect_every, max_detect_every))
+        self.frame_index = 0
+        self.detections = 0
+        self.detection_ms = None  # Moving average of the cost of one detection
+        self._frames_since_detection = 0
         
+        # Callbacks run whenever the drawing is cleared
+        self._clear_listeners = []
+        
+        # Callbacks that want the annotated preview; without any, track() draws nothing
+        self._preview_listeners = []
+        
+    def process_frame(self, frame: np.ndarray) -> Tuple[np.ndarray, HandTrackingResult]:
+        """Process a single frame and track hands, returns the annotated preview along with the result"""
+        result = self._track(frame)
+        annotated_frame = self.render_preview(frame, result)
+        self._publish_preview(annotated_frame, result)
+        return annotated_frame, result
+    
+    def track(self, frame: np.ndarray) -> HandTrackingResult:
+        """Process a single frame without annotating it
+        
+        The frame is neither copied nor drawn on; the preview is only rendered
+        when a preview listener is subscribed.
+        """
+        result = self._track(frame)
+        if self._preview_listeners:
+            self._publish_preview(self.render_preview(frame, result), result)
+        return result
+    
+    def add_preview_listener(self, callback):
+        """Call callback(annotated_frame, result) for every tracked frame"""
+        self._preview_listeners.append(callback)
+    
+    def remove_preview_listener(self, callback):
+        if callback in self._preview_listeners:
+            self._preview_listeners.remove(callback)
+    
+    def _publish_preview(self, annotated_frame, result):
+        for callback in list(self._preview_listeners):
+            callback(annotated_frame, result)
+    
+    def render_preview(self, frame: np.ndarray, result: HandTrackingResult) -> np.ndarray:
+        """Copy of the frame with the hand landmarks, fingertip and drawing status drawn on it"""
         # Create a copy of the frame to draw on
         annotated_frame = frame.copy()
         
-        # Initialize default results
-        index_finger_tip = (0, 0)
-        
-        # Check if hands are detected
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                # Draw hand landmarks on the frame
-                self.mp_drawing.draw_landmarks(
-                    annotated_frame,
-                    hand_landmarks,
-                    self.mp_hands.HAND_CONNECTIONS,
-                    self.mp_drawing_styles.get_default_hand_landmarks_style(),
-                    self.mp_drawing_styles.get_default_hand_connections_style()
-                )
-                
-                # Get index finger tip coordinates
-                index_finger = hand_landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
-                index_finger_tip = (int(index_finger.x * w), int(index_finger.y * h))
-                
-                # Get thumb tip coordinates to detect drawing gesture
-                thumb_tip = hand_landmarks.landmark[self.mp_hands.HandLandmark.THUMB_TIP]
-                thumb_tip_coords = (int(thumb_tip.x * w), int(thumb_tip.y * h))
-                
-                # Calculate distance between thumb and index finger
-                distance = np.sqrt((index_finger_tip[0] - thumb_tip_coords[0])**2 + 
-                                  (index_finger_tip[1] - thumb_tip_coords[1])**2)
-                
-                # If the thumb and index finger are close, we're drawing
-                drawing_threshold = 50  # Adjust based on your needs
-                
-                # Add cooldown to prevent jitter
-                if self.draw_cooldown > 0:
-                    self.draw_cooldown -= 1
-                
-                # Toggle drawing state if gesture changes and cooldown is zero
-                if distance < drawing_threshold and not self.is_drawing and self.draw_cooldown == 0:
-                    self.is_drawing = True
-                    self.draw_cooldown = 5  # Set cooldown frames
-                elif distance >= drawing_threshold and self.is_drawing and self.draw_cooldown == 0:
-                    self.is_drawing = False
-                    self.draw_cooldown = 5  # Set cooldown frames
-                
-                # If drawing, add the point to the path
-                if self.is_drawing:
-                    # Scale coordinates to canvas size
-                    canvas_x = int((index_finger.x * w) * (self.canvas_size[0] / w))
-                    canvas_y = int((index_finger.y * h) * (self.canvas_size[1] / h))
-                    self.drawing_path.append((canvas_x, canvas_y))
-        
-        # Draw the path on the canvas in WHITE
-        if len(self.drawing_path) > 1:
-            for i in range(1, len(self.drawing_path)):
-                cv2.line(
-                    self.canvas, 
-                    self.drawing_path[i-1], 
-                    self.drawing_path[i], 
-                    (255, 255, 255),  # WHITE color 
-                    thickness=5
-                )
+        # Draw hand landmarks on the frame, only known on frames that ran detection
+        for hand_landmarks in result.hand_landmarks or ():
+            self.mp_drawing.draw_landmarks(
+                annotated_frame,
+                hand_landmarks,
+                self.mp_hands.HAND_CONNECTIONS,
+                self.mp_drawing_styles.get_default_hand_landmarks_style(),
+                self.mp_drawing_styles.get_default_hand_connections_style()
+            )
         
         # Draw a dot at the index finger position
-        cv2.circle(annotated_frame, index_finger_tip, 10, (0, 255, 0), -1)
+        cv2.circle(annotated_frame, result.index_finger_tip, 10, (0, 255, 0), -1)
         
         # Draw drawing status on the frame
-        status_text = "Drawing" if self.is_drawing else "Not Drawing"
+        status_text = "Drawing" if result.is_drawing else "Not Drawing"
         cv2.putText(
             annotated_frame, 
             status_text, 
             (20, 50), 
             cv2.FONT_HERSHEY_SIMPLEX, 
             1, 
-            (0, 255, 0) if self.is_drawing else (0, 0, 255), 
+            (0, 255, 0) if result.is_drawing else (0, 0, 255), 
             2
         )
+        return annotated_frame
+    
+    def _track(self, frame):
+        h, w, _ = frame.shape
+        
+        # Initialize or reset canvas if needed - BLACK background
+        if self.canvas is None:
+            self.canvas = self._blank_canvas()
+        
+        # Process the frame with MediaPipe, unless this frame's fingertips are predicted
+        self.frame_index += 1
+        results = self._detect(frame) if self._should_detect() else None
+        
+        # Initialize default results
+        index_finger_tip = (0, 0)
+        hand_detected = False
+        hand_landmarks_list = None
+        
+        # Between detections, carry on from where the fingertips are expected to be
+        if results is None:
+            predicted = self.predictor.predict(self.frame_index)
+            if predicted is not None:
+                index_finger_tip = self._track_gesture(*predicted, w, h)
+                hand_detected = True
         
-        # Create the result object
+        # Check if hands are detected
+        elif results.multi_hand_landmarks:
+            hand_detected = True
+            hand_landmarks_list = list(results.multi_hand_landmarks)
+            for hand_landmarks in hand_landmarks_list:
+                # Get index finger and thumb tip coordinates to detect drawing gesture
+                index_finger = hand_landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP]
+                thumb_tip = hand_landmarks.landmark[self.mp_hands.HandLandmark.THUMB_TIP]
+                self.predictor.update((index_finger.x, index_finger.y, thumb_tip.x, thumb_tip.y), self.frame_index)
+                index_finger_tip = self._track_gesture(index_finger.x, index_finger.y, thumb_tip.x, thumb_tip.y, w, h)
+        else:
+            self.predictor.reset()
+        
+        # Create the result object; the canvas is only handed out when asked for
+        with self._canvas_lock:
+            canvas_version, drawing_path, drawing_bounds = self.canvas_version, self._path.view(), self.drawing_bounds
+            dirty_rect, self._dirty_rect = self._dirty_rect, None
         result = HandTrackingResult(
             index_finger_tip=index_finger_tip,
-            drawing_path=self.drawing_path.copy(),
+            drawing_path=drawing_path,
             is_drawing=self.is_drawing,
-            canvas=self.canvas.copy()
+            canvas_version=canvas_version,
+            hand_detected=hand_detected,
+            drawing_bounds=drawing_bounds,
+            dirty_rect=dirty_rect,
+            hand_landmarks=hand_landmarks_list,
+            canvas_source=self.canvas_at
         )
+        return result
+    
+    def _should_detect(self):
+        if self._frames_since_detection + 1 >= self.detect_every:
+            self._frames_since_detection = 0
+            return True
+        self._frames_since_detection += 1
+        return False
+    
+    def _detect(self, frame):
+        """MediaPipe results for the frame, only around the last hand when possible"""
+        start = time.perf_counter()
+        h, w = frame.shape[:2]
+        results = None
+        if self.roi_tracking and self._roi is not None:
+            results = self._process_roi(frame, self._roi)
+        if results is None:
+            # Convert the BGR image to RGB
+            results = self.hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        if self.roi_tracking:
+            self._roi = self._next_roi(results, w, h)
         
-        return annotated_frame, result
+        # Spread detections out just enough to stay within the budget
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.detections += 1
+        self.detection_ms = elapsed_ms if self.detection_ms is None else 0.9 * self.detection_ms + 0.1 * elapsed_ms
+        if self.detect_budget_ms:
+            self.detect_every = min(self.max_detect_every, max(1, math.ceil(self.detection_ms / self.detect_budget_ms)))
+        return results
+    
+    def _track_gesture(self, index_x, index_y, thumb_x, thumb_y, w, h):
+        """Update the drawing state from normalized fingertip positions, returns the index tip in frame pixels"""
+        index_finger_tip = (int(index_x * w), int(index_y * h))
+        thumb_tip_coords = (int(thumb_x * w), int(thumb_y * h))
+        
+        # Calculate distance between thumb and index finger
+        distance = np.sqrt((index_finger_tip[0] - thumb_tip_coords[0])**2 + 
+                          (index_finger_tip[1] - thumb_tip_coords[1])**2)
+        
+        # If the thumb and index finger are close, we're drawing
+        drawing_threshold = 50  # Adjust based on your needs
+        
+        # Add cooldown to prevent jitter
+        if self.draw_cooldown > 0:
+            self.draw_cooldown -= 1
+        
+        # Toggle drawing state if gesture changes and cooldown is zero
+        if distance < drawing_threshold and not self.is_drawing and self.draw_cooldown == 0:
+            self.is_drawing = True
+            self.draw_cooldown = 5  # Set cooldown frames
+        elif distance >= drawing_threshold and self.is_drawing and self.draw_cooldown == 0:
+            self.is_drawing = False
+            self.draw_cooldown = 5  # Set cooldown frames
+        
+        # If drawing, add the point to the path
+        if self.is_drawing:
+            # Scale coordinates to canvas size
+            canvas_x = int((index_x * w) * (self.canvas_size[0] / w))
+            canvas_y = int((index_y * h) * (self.canvas_size[1] / h))
+            self._add_point((canvas_x, canvas_y))
+        return index_finger_tip
+    
+    def _process_roi(self, frame, roi):
+        """MediaPipe results for the box scaled to a fixed size, mapped back to frame coordinates, or None if the hand is lost"""
+        x_min, y_min, size = roi
+        # One warp crops, scales and pads past the frame edges; a fixed input
+        # size also keeps MediaPipe from reallocating on every frame
+        scale = self.roi_input_size / size
+        matrix = np.array([[scale, 0, -x_min * scale], [0, scale, -y_min * scale]])
+        crop = cv2.warpAffine(frame, matrix, (self.roi_input_size, self.roi_input_size), flags=cv2.INTER_LINEAR,
+                              borderMode=cv2.BORDER_CONSTANT, borderValue=0)
+        
+        results = self.hands.process(cv2.cvtColor(crop, cv2.COLOR_BGR2RGB))
+        if not results.multi_hand_landmarks:
+            self.roi_misses += 1
+            return None
+        
+        # Landmarks are normalized to the box, everything else expects the frame
+        h, w = frame.shape[:2]
+        for hand_landmarks in results.multi_hand_landmarks:
+            for landmark in hand_landmarks.landmark:
+                landmark.x = (x_min + landmark.x * size) / w
+                landmark.y = (y_min + landmark.y * size) / h
+        self.roi_hits += 1
+        return results
+    
+    def _next_roi(self, results, width, height):
+        """(x_min, y_min, size) of a square around all detected landmarks grown by roi_margin, or None without a hand"""
+        if not results.multi_hand_landmarks:
+            return None
+        xs = [landmark.x * width for hand in results.multi_hand_landmarks for landmark in hand.landmark]
+        ys = [landmark.y * height for hand in results.multi_hand_landmarks for landmark in hand.landmark]
+        size = max(max(xs) - min(xs), max(ys) - min(ys)) * (1 + 2 * self.roi_margin)
+        
+        # Too small to find a hand in, e.g. only a few landmarks were placed
+        if size < 32:
+            return None
+        center_x, center_y = (max(xs) + min(xs)) / 2, (max(ys) + min(ys)) / 2
+        return center_x - size / 2, center_y - size / 2, size
+    
+    @property
+    def drawing_path(self):
+        """Read-only (n, 2) view of the path points, unaffected by later drawing"""
+        return self._path.view()
+    
+    def canvas_snapshot(self):
+        """Read-only view of the canvas as it is now, unaffected by later drawing"""
+        with self._canvas_lock:
+            return self._canvas_view()
+    
+    def drawing_snapshot(self):
+        """(canvas, canvas_version, drawing_path, drawing_bounds), all of the same moment"""
+        with self._canvas_lock:
+            return self._canvas_view(), self.canvas_version, self._path.view(), self.drawing_bounds
+    
+    def canvas_at(self, version):
+        """Read-only view of the canvas if it is still at version, otherwise None"""
+        with self._canvas_lock:
+            return self._canvas_view() if version == self.canvas_version else None
+    
+    def changed_canvas(self, since_version):
+        """(canvas, canvas_version) if the canvas changed since since_version, otherwise None
+        
+        Lets a consumer that polls the canvas take a snapshot, which makes the
+        next drawn segment copy the canvas, only when there is something new.
+        """
+        with self._canvas_lock:
+            if since_version == self.canvas_version:
+                return None
+            return self._canvas_view(), self.canvas_version
+    
+    def _canvas_view(self):
+        if self.canvas is None:
+            return None
+        self._canvas_shared = True
+        snapshot = self.canvas.view()
+        snapshot.flags.writeable = False
+        return snapshot
+    
+    def _blank_canvas(self):
+        return np.zeros((self.canvas_size[1], self.canvas_size[0]), dtype=np.uint8)
+    
+    def _add_point(self, point):
+        """Append a point and draw just the segment it adds, in WHITE"""
+        with self._canvas_lock:
+            self._path.append(point)
+            self.canvas_version += 1
+            self._grow_bounds(*point)
+            if len(self._path) < 2:
+                return
+            
+            start = self._path.point(-2)
+            # Copy on write, so snapshots already handed out keep their content
+            if self._canvas_shared:
+                self.canvas = self.canvas.copy()
+                self._canvas_shared = False
+            cv2.line(self.canvas, start, point, 255, thickness=self.stroke_thickness)
+            
+            # Everything the line can have touched, clipped to the canvas
+            margin = self.stroke_thickness
+            segment = (max(0, min(start[0], point[0]) - margin), max(0, min(start[1], point[1]) - margin),
+                       min(self.canvas_size[0] - 1, max(start[0], point[0]) + margin),
+                       min(self.canvas_size[1] - 1, max(start[1], point[1]) + margin))
+            self._mark_dirty(segment)
+    
+    def _mark_dirty(self, rect):
+        if self._dirty_rect is None:
+            self._dirty_rect = rect
+        else:
+            self._dirty_rect = (min(self._dirty_rect[0], rect[0]), min(self._dirty_rect[1], rect[1]),
+                                max(self._dirty_rect[2], rect[2]), max(self._dirty_rect[3], rect[3]))
+    
+    def _grow_bounds(self, x, y):
+        if self.drawing_bounds is None:
+            self.drawing_bounds = (x, y, x, y)
+        else:
+            x_min, y_min, x_max, y_max = self.drawing_bounds
+            self.drawing_bounds = (min(x_min, x), min(y_min, y), max(x_max, x), max(y_max, y))
+    
+    def add_clear_listener(self, callback):
+        """Call callback() every time the drawing is cleared"""
+        self._clear_listeners.append(callback)
     
     def clear_drawing(self):
         """Clear the current drawing"""
-        self.drawing_path = []
-        self.canvas = np.zeros((self.canvas_size[1], self.canvas_size[0], 3), dtype=np.uint8)
+        with self._canvas_lock:
+            self._path = PathBuffer()
+            self.drawing_bounds = None
+            self.canvas = self._blank_canvas()
+            self._canvas_shared = False
+            self.canvas_version += 1
+            self._dirty_rect = (0, 0, self.canvas_size[0] - 1, self.canvas_size[1] - 1)
+        for callback in self._clear_listeners:
+            callback()
     
     def release(self):
         """Release resources"""
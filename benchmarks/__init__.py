@@ -0,0 +1,4 @@
+"""Benchmarks for the recognition and tracking hot paths
+
+Run from the project root, e.g. ``python -m benchmarks.inference_latency``.
+"""
@@ -0,0 +1,112 @@
+"""Preview lag of the serial camera loop against the staged CameraPipeline
+
+Replays a recorded session or video in real time, as a camera would
+deliver it, through HandTracker with a UI update that takes --publish-ms.
+The serial loop reads, tracks and publishes one frame after the other, so
+frames wait longer and longer once a frame takes more than the frame
+interval. The pipeline always works on the newest frame and drops the
+rest. Lag is the time from when a frame was due until it was published.
+
+    python -m benchmarks.camera_pipeline --video session --seconds 10 --publish-ms 20 40
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks.common import compare_to_baseline, summarize, write_json
+from backend.src.camera_pipeline import CameraPipeline
+from backend.src.frame_encoder import FrameEncoder
+from backend.src.frame_source import open_source
+from backend.src.tracker import HandTracker
+
+
+class LagRecorder:
+    """Lag of every published frame behind the time it was due"""
+    def __init__(self):
+        self.started_at = None
+        self.lags = []
+
+    def due(self, timestamp):
+        if self.started_at is None:
+            self.started_at = time.monotonic() - timestamp
+        return self.started_at + timestamp
+
+    def published(self, due_at):
+        self.lags.append(time.monotonic() - due_at)
+
+
+def fake_publish(tracker, encoder, frame, result, publish_ms):
+    """Render and encode the preview like the UI, then wait for a page update"""
+    encoder.encode(tracker.render_preview(frame, result))
+    time.sleep(publish_ms / 1000)
+
+
+def run_serial(video, seconds, publish_ms):
+    tracker, encoder, lag = HandTracker(max_hands=1), FrameEncoder((370, 200)), LagRecorder()
+    with open_source(video, realtime=True, loop=True) as source:
+        while source.timestamp < seconds:
+            ret, frame = source.read()
+            if not ret:
+                break
+            due_at = lag.due(source.timestamp)
+            frame = cv2.flip(frame, 1)
+            result = tracker.track(frame)
+            fake_publish(tracker, encoder, frame, result, publish_ms)
+            lag.published(due_at)
+    tracker.release()
+    return {"published": len(lag.lags), "lag": summarize(np.array(lag.lags) * 1000)}
+
+
+def run_pipeline(video, seconds, publish_ms):
+    tracker, encoder, lag = HandTracker(max_hands=1), FrameEncoder((370, 200)), LagRecorder()
+    with open_source(video, realtime=True, loop=True) as source:
+        # Carry the due time of every frame through the stages
+        pipeline = CameraPipeline(
+            source,
+            prepare=lambda frame: (cv2.flip(frame, 1), lag.due(source.timestamp)),
+            track=lambda item: (tracker.track(item[0]), item[1]),
+            publish=lambda item, out: (fake_publish(tracker, encoder, item[0], out[0], publish_ms),
+                                       lag.published(out[1])),
+        )
+        pipeline.start()
+        time.sleep(seconds)
+        stats = pipeline.stats()
+        pipeline.stop()
+    tracker.release()
+    return {"published": len(lag.lags), "lag": summarize(np.array(lag.lags) * 1000), "stages": stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--video", required=True, help="Recorded session or video file to replay")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--publish-ms", type=float, nargs="+", default=[0, 20, 40], help="Simulated page.update times")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Compare against a previous --json run")
+    args = parser.parse_args()
+
+    report = {"config": {"video": args.video, "seconds": args.seconds}, "runs": {}}
+    print(f"{'publish':>8} | {'loop':<8} | {'frames':>6} | {'lag p50':>9} | {'lag p99':>9} | dropped (track/publish)")
+    for publish_ms in args.publish_ms:
+        serial = run_serial(args.video, args.seconds, publish_ms)
+        staged = run_pipeline(args.video, args.seconds, publish_ms)
+        report["runs"][f"{publish_ms:g}ms"] = {"serial": serial, "pipeline": staged}
+        for name, run in (("serial", serial), ("pipeline", staged)):
+            dropped = ""
+            if "stages" in run:
+                dropped = f"{run['stages']['track']['dropped']}/{run['stages']['publish']['dropped']}"
+            print(f"{publish_ms:>6g}ms | {name:<8} | {run['published']:>6} | {run['lag']['p50_ms']:>7.1f}ms | "
+                  f"{run['lag']['p99_ms']:>7.1f}ms | {dropped}")
+
+    if args.json:
+        write_json(report, args.json)
+    if args.baseline:
+        regressions = compare_to_baseline(report, args.baseline)
+        if regressions:
+            raise SystemExit(f"{len(regressions)} metric(s) regressed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Helpers shared by the benchmark scripts"""
+import json
+import os
+import resource
+import sys
+import time
+
+import numpy as np
+
+# Make the backend importable when a benchmark runs as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def summarize(latencies_ms):
+    """Percentiles of a list of latencies in milliseconds"""
+    latencies_ms = np.asarray(latencies_ms, dtype=np.float64)
+    return {
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p90_ms": float(np.percentile(latencies_ms, 90)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "mean_ms": float(latencies_ms.mean()),
+    }
+
+
+def timed(fn, *args):
+    """Call fn and return (result, elapsed milliseconds)"""
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def rss_mb():
+    """Current resident set size in MiB"""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def write_json(report, path):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {path}")
+
+
+def compare_to_baseline(report, baseline_path, tolerance=0.15):
+    """Print every *_ms metric that regressed by more than tolerance against a stored run
+    
+    Returns the list of regressed metric names.
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    def flatten(tree, prefix=""):
+        for key, value in tree.items():
+            name = f"{prefix}{key}"
+            if isinstance(value, dict):
+                yield from flatten(value, name + ".")
+            elif key.endswith("_ms"):
+                yield name, value
+
+    current = dict(flatten(report))
+    regressions = []
+    for name, before in flatten(baseline):
+        after = current.get(name)
+        if after is None or before <= 0:
+            continue
+        change = after / before - 1
+        marker = ""
+        if change > tolerance:
+            marker = "  <-- regression"
+            regressions.append(name)
+        print(f"{name:<48} {before:>9.3f} -> {after:>9.3f} ms ({change:+.0%}){marker}")
+    return regressions
@@ -0,0 +1,123 @@
+"""Preview encoding cost: PIL round trip against FrameEncoder
+
+Encodes camera frames and the drawing canvas the way the UI loops do, once
+through the old PIL path (RGB conversion, PIL resize, JPEG into BytesIO)
+and once through FrameEncoder. The canvas is replayed as a user draws it:
+one new version per point, then --idle frames without a change, during
+which FrameEncoder skips the encoding.
+
+    python -m benchmarks.encoding --video session --json run.json --baseline baseline.json
+"""
+import argparse
+import base64
+import io
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from benchmarks.common import compare_to_baseline, summarize, timed, write_json
+from benchmarks.synthetic import canvas_set, render_canvas
+from backend.src.frame_encoder import FrameEncoder
+from backend.src.frame_source import open_source
+
+CAMERA_SIZE = (370, 200)
+CANVAS_SIZE = (370, 200)
+
+
+def load_frames(video, count, seed=0):
+    """BGR frames from a recorded session or video, or smooth random 720p frames without one"""
+    if video:
+        with open_source(video) as source:
+            frames = [frame for _, frame in zip(range(count), source)]
+        if not frames:
+            raise SystemExit(f"No frames could be read from {video}")
+        return frames
+    rng = np.random.default_rng(seed)
+    return [cv2.GaussianBlur(rng.integers(0, 256, (720, 1280, 3), dtype=np.uint8), (0, 0), 8)
+            for _ in range(count)]
+
+
+def legacy_encode(frame, size, quality=90):
+    """The PIL path the UI used before FrameEncoder"""
+    if frame.ndim == 3:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    image = Image.fromarray(frame).resize(size)
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=quality)
+    return base64.b64encode(buffer.getvalue()).decode('utf-8')
+
+
+def canvas_timeline(samples, idle, seed=0):
+    """(canvas, version) per UI frame while letters are drawn point by point"""
+    _, strokes, _ = canvas_set(samples, seed)
+    version = 0
+    for letter_strokes in strokes:
+        drawn = []
+        for stroke in letter_strokes:
+            for end in range(1, len(stroke) + 1):
+                version += 1
+                yield render_canvas(drawn + [stroke[:end]]), version
+            drawn.append(stroke)
+        for _ in range(idle):
+            yield render_canvas(drawn), version
+
+
+def bench(frames, size, versions=None):
+    """Per-frame latencies of both paths; versions let FrameEncoder skip unchanged frames"""
+    encoder = FrameEncoder(size)
+    versions = versions or [None] * len(frames)
+    legacy_encode(frames[0], size)
+    encoder.encode(frames[0])
+    encoder.reset()
+    legacy = [timed(legacy_encode, frame, size)[1] for frame in frames]
+    encoded = [timed(encoder.encode, frame, version)[1] for frame, version in zip(frames, versions)]
+    stats = encoder.stats()
+    return {
+        "legacy": summarize(legacy),
+        "encoder": summarize(encoded),
+        # Encodes only, without the skipped frames
+        "encode_p50_ms": stats["encode_p50_ms"],
+        "skip_rate": stats["skipped"] / len(frames),
+        "mean_bytes": stats["mean_bytes"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--video", help="Recorded session or video file for the camera frames")
+    parser.add_argument("--frames", type=int, default=200, help="Camera frames to encode")
+    parser.add_argument("--samples", type=int, default=10, help="Letters drawn on the canvas")
+    parser.add_argument("--idle", type=int, default=30, help="Unchanged canvas frames after each letter")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Compare against a previous --json run")
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.frames, args.seed)
+    canvases, versions = zip(*canvas_timeline(args.samples, args.idle, args.seed))
+    report = {
+        "config": {"frames": len(frames), "canvas_frames": len(canvases), "idle": args.idle, "seed": args.seed},
+        "camera": bench(frames, CAMERA_SIZE),
+        "canvas": bench(list(canvases), CANVAS_SIZE, list(versions)),
+    }
+
+    print(f"{'stream':<8} | {'path':<8} | {'p50':>8} | {'p99':>8} | {'mean':>8}")
+    for stream in ("camera", "canvas"):
+        for path in ("legacy", "encoder"):
+            row = report[stream][path]
+            print(f"{stream:<8} | {path:<8} | {row['p50_ms']:>6.3f}ms | {row['p99_ms']:>6.3f}ms | {row['mean_ms']:>6.3f}ms")
+        speedup = report[stream]["legacy"]["mean_ms"] / report[stream]["encoder"]["mean_ms"]
+        print(f"{stream}: {speedup:.1f}x faster on average, {report[stream]['skip_rate']:.0%} of frames skipped, "
+              f"{report[stream]['mean_bytes'] / 1024:.1f} KiB per JPEG")
+
+    if args.json:
+        write_json(report, args.json)
+    if args.baseline:
+        regressions = compare_to_baseline(report, args.baseline)
+        if regressions:
+            raise SystemExit(f"{len(regressions)} metric(s) regressed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Preview frame rate of a fixed sleep against FrameScheduler
+
+Runs a preview loop with simulated frame work (--work-ms) and page updates
+(--update-ms) for a few seconds, once sleeping 30 ms after every frame as
+the camera loops used to and once paced by FrameScheduler. Reports the
+frame rate reached, its jitter, and the CPU time spent per second.
+
+    python -m benchmarks.frame_pacing --work-ms 5 15 --update-ms 5 60
+"""
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+from benchmarks.common import write_json
+from backend.src.frame_scheduler import FrameScheduler
+
+
+def busy(ms):
+    """Burn CPU like encoding a frame would"""
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        pass
+
+
+def run(pace, work_ms, update_ms, seconds, update_timer=None):
+    frame_times = []
+    cpu_start = time.process_time()
+    start = time.monotonic()
+    while time.monotonic() - start < seconds:
+        pace()
+        frame_times.append(time.monotonic())
+        busy(work_ms)
+        if update_timer is not None:
+            with update_timer():
+                time.sleep(update_ms / 1000)  # Waiting for the client, not CPU
+        else:
+            time.sleep(update_ms / 1000)
+    intervals = np.diff(frame_times) * 1000
+    return {
+        "fps": len(frame_times) / seconds,
+        "interval_p50_ms": float(np.percentile(intervals, 50)),
+        "interval_jitter_ms": float(intervals.std()),
+        "cpu_ms_per_s": (time.process_time() - cpu_start) * 1000 / seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--work-ms", type=float, nargs="+", default=[5, 15])
+    parser.add_argument("--update-ms", type=float, nargs="+", default=[5, 60])
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+
+    report = {}
+    print(f"{'work':>6} | {'update':>6} | {'loop':<9} | {'fps':>5} | {'interval':>8} | {'jitter':>7} | {'cpu/s':>7}")
+    for work_ms, update_ms in itertools.product(args.work_ms, args.update_ms):
+        scheduler = FrameScheduler(args.fps)
+        runs = {
+            "sleep": run(lambda: time.sleep(0.03), work_ms, update_ms, args.seconds),
+            "scheduler": run(scheduler.wait, work_ms, update_ms, args.seconds, scheduler.measure_update),
+        }
+        report[f"work{work_ms:g}_update{update_ms:g}"] = runs
+        for name, row in runs.items():
+            print(f"{work_ms:>4g}ms | {update_ms:>4g}ms | {name:<9} | {row['fps']:>5.1f} | "
+                  f"{row['interval_p50_ms']:>6.1f}ms | {row['interval_jitter_ms']:>5.1f}ms | {row['cpu_ms_per_s']:>5.0f}ms")
+
+    if args.json:
+        write_json(report, args.json)
+
+
+if __name__ == "__main__":
+    main()
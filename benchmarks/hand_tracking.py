@@ -0,0 +1,96 @@
+"""Per-frame cost of HandTracker at 720p and 480p, full frame vs region of interest
+
+Frames come from a recorded session or video file when one is given,
+resized to each resolution. Without one, synthetic frames are used; they contain no hand,
+so ROI tracking never engages there and the "roi_input" row, MediaPipe on
+a fixed downscaled box, stands in for its per-frame cost. The "headless"
+row tracks the full frame without rendering the annotated preview.
+
+    python -m benchmarks.hand_tracking --video session.mp4 --json run.json
+"""
+import argparse
+
+import cv2
+import numpy as np
+
+from benchmarks.common import compare_to_baseline, summarize, timed, write_json
+from backend.src.frame_source import open_source
+from backend.src.tracker import HandTracker
+
+RESOLUTIONS = {"720p": (1280, 720), "480p": (854, 480)}
+
+
+def load_frames(video, count, seed=0):
+    """BGR frames from a recorded session or video, or smooth random frames without one"""
+    if video:
+        with open_source(video) as source:
+            frames = []
+            for frame in source:
+                frames.append(frame)
+                if len(frames) >= count:
+                    break
+        if not frames:
+            raise SystemExit(f"No frames could be read from {video}")
+        return frames
+    rng = np.random.default_rng(seed)
+    return [cv2.GaussianBlur(rng.integers(0, 256, (720, 1280, 3), dtype=np.uint8), (0, 0), 8)
+            for _ in range(count)]
+
+
+def bench_resolution(frames, size):
+    frames = [cv2.resize(frame, size, interpolation=cv2.INTER_AREA) for frame in frames]
+    report = {}
+    for mode, roi_tracking, headless in (("full", False, False), ("roi", True, False), ("headless", False, True)):
+        tracker = HandTracker(max_hands=1, roi_tracking=roi_tracking)
+        # track() skips the annotated preview, process_frame() renders it
+        process = tracker.track if headless else tracker.process_frame
+        process(frames[0])  # Warm up
+        latencies = [timed(process, frame)[1] for frame in frames]
+        report[mode] = summarize(latencies)
+        if roi_tracking:
+            tracked = tracker.roi_hits + tracker.roi_misses
+            report[mode]["roi_hit_rate"] = tracker.roi_hits / tracked if tracked else 0.0
+        tracker.release()
+
+    # MediaPipe on a centered box as tall as 60% of the frame
+    width, height = size
+    box = (width / 2 - height * 0.3, height * 0.2, height * 0.6)
+    tracker = HandTracker(max_hands=1, roi_tracking=True)
+    tracker._process_roi(frames[0], box)
+    report["roi_input"] = summarize([timed(tracker._process_roi, frame, box)[1] for frame in frames])
+    tracker.release()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--video", help="Recorded session or video file to replay, synthetic frames otherwise")
+    parser.add_argument("--frames", type=int, default=150)
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Compare against a previous --json run")
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.frames)
+    report = {
+        "config": {"video": args.video, "frames": len(frames)},
+        "resolutions": {name: bench_resolution(frames, size) for name, size in RESOLUTIONS.items()},
+    }
+
+    print(f"{'input':<16} | {'p50':>8} | {'p90':>8} | {'p99':>8}")
+    for name, modes in report["resolutions"].items():
+        for mode, row in modes.items():
+            label = f"{name} {mode}"
+            print(f"{label:<16} | {row['p50_ms']:>6.2f}ms | {row['p90_ms']:>6.2f}ms | {row['p99_ms']:>6.2f}ms")
+        if args.video:
+            print(f"{name} ROI hit rate: {modes['roi']['roi_hit_rate']:.1%}")
+
+    if args.json:
+        write_json(report, args.json)
+    if args.baseline:
+        regressions = compare_to_baseline(report, args.baseline)
+        if regressions:
+            raise SystemExit(f"{len(regressions)} metric(s) regressed")
+
+
+if __name__ == "__main__":
+    main()
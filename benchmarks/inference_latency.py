@@ -0,0 +1,122 @@
+"""Before/after latency of HandModel inference
+
+Compares the Keras ``model.predict`` path against the traced direct
+inference path for the batch sizes the model is specialized for. With
+--sessions, that many threads also recognize drawings at once, each
+calling the shared model directly and then through a
+RecognitionDispatcher, whose queue depth, batch sizes and wait times are
+reported.
+
+    python -m benchmarks.inference_latency --repeats 200 --sessions 1 4 8
+"""
+import argparse
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.common import summarize, write_json
+from backend.src.dispatcher import RecognitionDispatcher
+from backend.src.hand_model import HandModel, MODEL_PATH, TRACED_BATCH_SIZES
+
+
+def random_glyphs(n, seed=0):
+    """Black-on-white 28x28 images with a few random strokes"""
+    rng = np.random.default_rng(seed)
+    images = np.full((n, 28, 28), 255, dtype=np.uint8)
+    for img in images:
+        for _ in range(3):
+            y, x = rng.integers(4, 24, size=2)
+            img[y:y + 2, max(0, x - 6):x + 6] = 0
+    return list(images)
+
+
+def time_predict(model, images, repeats):
+    """Return per-call latencies in milliseconds"""
+    model.predict_batch(images)  # Warm up
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict_batch(images)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies)
+
+
+def time_sessions(model, sessions, repeats, variants=4):
+    """Per-call latencies in milliseconds while every session predicts its variants concurrently"""
+    latencies = [[] for _ in range(sessions)]
+    start_together = threading.Barrier(sessions)
+
+    def session(i):
+        images = random_glyphs(variants, seed=i)
+        start_together.wait()
+        for _ in range(repeats):
+            start = time.perf_counter()
+            model.predict_batch(images)
+            latencies[i].append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return np.concatenate(latencies)
+
+
+def bench_sessions(model, sessions, repeats):
+    """Concurrent sessions on the shared model, without and with the dispatcher"""
+    report = {}
+    for count in sessions:
+        dispatcher = RecognitionDispatcher(model)
+        try:
+            time_sessions(dispatcher, 1, 1)  # Warm up
+            report[count] = {
+                "shared": summarize(time_sessions(model, count, repeats)),
+                "dispatcher": summarize(time_sessions(dispatcher, count, repeats)),
+                "dispatcher_stats": dispatcher.stats(),
+            }
+        finally:
+            dispatcher.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--repeats", type=int, default=100)
+    parser.add_argument("--sessions", type=int, nargs="*", default=[], help="Concurrent sessions to simulate")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    models = {
+        "model.predict": HandModel(args.model, direct_inference=False),
+        "direct": HandModel(args.model, direct_inference=True),
+    }
+
+    report = {}
+    for batch_size in TRACED_BATCH_SIZES:
+        images = random_glyphs(batch_size)
+        report[batch_size] = {name: summarize(time_predict(model, images, args.repeats))
+                              for name, model in models.items()}
+
+    print(f"{'batch':>5} | {'predict p50':>11} | {'direct p50':>10} | {'predict p99':>11} | {'direct p99':>10} | speedup")
+    for batch_size, row in report.items():
+        before, after = row["model.predict"], row["direct"]
+        print(f"{batch_size:>5} | {before['p50_ms']:>9.2f}ms | {after['p50_ms']:>8.2f}ms | "
+              f"{before['p99_ms']:>9.2f}ms | {after['p99_ms']:>8.2f}ms | {before['p50_ms'] / after['p50_ms']:.1f}x")
+
+    if args.sessions:
+        sessions = report["sessions"] = bench_sessions(models["direct"], args.sessions, args.repeats)
+        print(f"\n{'sessions':>8} | {'shared p50':>10} | {'batched p50':>11} | {'batched p99':>11} | "
+              f"{'wait p50':>8} | batch sizes")
+        for count, row in sessions.items():
+            stats = row["dispatcher_stats"]
+            print(f"{count:>8} | {row['shared']['p50_ms']:>8.2f}ms | {row['dispatcher']['p50_ms']:>9.2f}ms | "
+                  f"{row['dispatcher']['p99_ms']:>9.2f}ms | {stats['wait_p50_ms']:>6.2f}ms | {stats['batch_sizes']}")
+
+    if args.json:
+        write_json(report, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Microbenchmark of the legacy and fused canvas preprocessing
+
+Times every stage of both implementations on synthetic canvases and checks
+that the fused variants match the legacy ones: a variant may differ in at
+most --max-diff of its 784 pixels, otherwise the run fails.
+
+    python -m benchmarks.preprocessing --json run.json --baseline baseline.json
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.common import compare_to_baseline, summarize, timed, write_json
+from benchmarks.synthetic import canvas_set
+from backend.src.preprocessing import (VARIANT_NAMES, build_variants, extract_letter_square, fused_variants,
+                                       ink_bounds, stroke_bounds)
+
+
+def bench_legacy(canvases):
+    stages = {"roi": [], "variants": [], "total": []}
+    outputs = []
+    for canvas in canvases:
+        square, roi_ms = timed(extract_letter_square, canvas)
+        variants, variants_ms = timed(build_variants, square)
+        stages["roi"].append(roi_ms)
+        stages["variants"].append(variants_ms)
+        stages["total"].append(roi_ms + variants_ms)
+        outputs.append(variants)
+    return {name: summarize(values) for name, values in stages.items()}, outputs
+
+
+def bench_fused(canvases, bounds):
+    stages = {"ink_bounds": [], "ink_bounds_unhinted": [], "total": [], "total_unhinted": []}
+    outputs = []
+    for canvas, hint in zip(canvases, bounds):
+        stages["ink_bounds"].append(timed(ink_bounds, canvas, hint)[1])
+        stages["ink_bounds_unhinted"].append(timed(ink_bounds, canvas)[1])
+        variants, total_ms = timed(fused_variants, canvas, hint)
+        stages["total"].append(total_ms)
+        stages["total_unhinted"].append(timed(fused_variants, canvas)[1])
+        outputs.append(variants)
+    return {name: summarize(values) for name, values in stages.items()}, outputs
+
+
+def compare_outputs(legacy, fused):
+    """Differing pixels per variant, as {name: {"max": ..., "identical": fraction}}"""
+    diffs = np.array([[int(np.count_nonzero(a != b)) for a, b in zip(old, new)] for old, new in zip(legacy, fused)])
+    return {name: {"max": int(diffs[:, i].max()), "identical": float((diffs[:, i] == 0).mean())}
+            for i, name in enumerate(VARIANT_NAMES)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=260, help="Synthetic canvases to run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-diff", type=int, default=8, help="Differing pixels allowed per variant")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Compare against a previous --json run")
+    args = parser.parse_args()
+
+    canvases, strokes, _ = canvas_set(args.samples, args.seed)
+    bounds = [stroke_bounds(np.concatenate(letter_strokes)) for letter_strokes in strokes]
+
+    legacy_stages, legacy = bench_legacy(canvases)
+    fused_stages, fused = bench_fused(canvases, bounds)
+    report = {
+        "config": {"samples": args.samples, "seed": args.seed},
+        "legacy": legacy_stages,
+        "fused": fused_stages,
+        "equivalence": compare_outputs(legacy, fused),
+    }
+
+    print(f"{'stage':<28} | {'p50':>8} | {'p90':>8} | {'p99':>8}")
+    for implementation in ("legacy", "fused"):
+        for name, row in report[implementation].items():
+            label = f"{implementation}.{name}"
+            print(f"{label:<28} | {row['p50_ms']:>6.3f}ms | {row['p90_ms']:>6.3f}ms | {row['p99_ms']:>6.3f}ms")
+    speedup = legacy_stages["total"]["p50_ms"] / fused_stages["total"]["p50_ms"]
+    print(f"fused speedup at p50: {speedup:.1f}x")
+    for name, row in report["equivalence"].items():
+        print(f"{name:<12} identical on {row['identical']:.1%} of canvases, at most {row['max']} pixel(s) differ")
+
+    if args.json:
+        write_json(report, args.json)
+    if args.baseline:
+        regressions = compare_to_baseline(report, args.baseline)
+        if regressions:
+            raise SystemExit(f"{len(regressions)} metric(s) regressed")
+    mismatched = [name for name, row in report["equivalence"].items() if row["max"] > args.max_diff]
+    if mismatched:
+        raise SystemExit(f"Fused variants differ from the legacy ones: {', '.join(mismatched)}")
+
+
+if __name__ == "__main__":
+    main()
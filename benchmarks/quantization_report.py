@@ -0,0 +1,86 @@
+"""Accuracy vs latency report for the quantized model tiers
+
+Every tier is loaded in a fresh process so resident memory is measured
+in isolation. Top-1 agreement is taken against the float Keras model on
+glyphs rendered with a different seed than the int8 calibration set.
+
+    python -m benchmarks.quantization_report --convert
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from benchmarks.common import peak_rss_mb, rss_mb, summarize, write_json
+from backend.src.hand_model import MODEL_PATH
+from backend.src.quantize import MODES, convert, quantized_path
+
+EVAL_SEED = 1234
+
+
+def measure_tier(model_path, backend, samples, repeats):
+    """Load one tier and return its predictions, latencies and memory"""
+    from backend.src.glyphs import glyph_set
+    from backend.src.hand_model import HandModel
+
+    images, labels = glyph_set(samples, seed=EVAL_SEED)
+    rss_before = rss_mb()
+    model = HandModel(model_path, backend=backend)
+    rss_loaded = rss_mb()
+
+    predictions, _ = model.predict_batch(images, top_k=1)
+
+    latencies = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        model.predict_batch([images[i % len(images)]], top_k=1)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "predictions": [str(p) for p in predictions[:, 0]],
+        "label_accuracy": float(np.mean(predictions[:, 0] == np.array(labels))),
+        **summarize(latencies),
+        "rss_mb": rss_loaded,
+        "model_rss_mb": rss_loaded - rss_before,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--samples", type=int, default=520)
+    parser.add_argument("--repeats", type=int, default=300)
+    parser.add_argument("--convert", action="store_true", help="(Re)build the quantized models first")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    tiers = {"float (keras)": (args.model, "keras"), "float (numpy)": (args.model, "numpy")}
+    for mode in MODES:
+        path = quantized_path(args.model, mode)
+        if args.convert or not os.path.exists(path):
+            convert(args.model, mode)
+        tiers[f"{mode} (tflite)"] = (path, "tflite")
+
+    report = {}
+    context = multiprocessing.get_context("spawn")
+    for name, (path, backend) in tiers.items():
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            report[name] = pool.submit(measure_tier, path, backend, args.samples, args.repeats).result()
+
+    reference = np.array(report["float (keras)"]["predictions"])
+    print(f"{'tier':<16} | {'top-1 agree':>11} | {'p50':>8} | {'p99':>8} | {'RSS':>8} | {'model RSS':>9}")
+    for name, row in report.items():
+        row["top1_agreement"] = float(np.mean(np.array(row.pop("predictions")) == reference))
+        print(f"{name:<16} | {row['top1_agreement']:>10.1%} | {row['p50_ms']:>6.2f}ms | {row['p99_ms']:>6.2f}ms | "
+              f"{row['rss_mb']:>6.0f}MB | {row['model_rss_mb']:>7.0f}MB")
+
+    if args.json:
+        write_json(report, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""End-to-end benchmark of the letter recognition hot path
+
+Renders synthetic A-Z drawings onto 400x400 canvases and runs the same
+canvas -> variants -> prediction pipeline as "Recognize Letter",
+timing every stage, plus the point-cloud vector tier on the raw strokes.
+Results are written as JSON and can be compared against a stored
+baseline run.
+
+    python -m benchmarks.recognition --json run.json --baseline baseline.json
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.common import compare_to_baseline, peak_rss_mb, rss_mb, summarize, timed, write_json
+from benchmarks.synthetic import canvas_set
+from backend.src.hand_model import HandModel, MODEL_PATH
+from backend.src.point_cloud import PointCloudRecognizer, load_calibration, load_strokes
+from backend.src.preprocessing import prepare_variants, stroke_bounds
+
+THROUGHPUT_BATCH_SIZES = (1, 4, 8, 16, 32)
+
+
+def bench_pipeline(model, canvases, strokes, labels):
+    """Per-stage latencies over every canvas, and how often the right letter wins"""
+    stages = {"variants": [], "predict": [], "total": []}
+    correct = 0
+    for canvas, letter_strokes, label in zip(canvases, strokes, labels):
+        # The tracker knows the bounds of its points, like the app does
+        bounds = stroke_bounds(np.concatenate(letter_strokes))
+        batch, variants_ms = timed(prepare_variants, canvas, bounds)
+        (predicted, confidences), predict_ms = timed(model.predict_batch, batch, 1)
+        stages["variants"].append(variants_ms)
+        stages["predict"].append(predict_ms)
+        stages["total"].append(variants_ms + predict_ms)
+        correct += predicted[int(np.argmax(confidences[:, 0])), 0] == label
+    return {name: summarize(values) for name, values in stages.items()}, correct / len(labels)
+
+
+def scribbles(count, seed=0):
+    """Random drawings that are no letter, for the vector tier's false accepts"""
+    rng = np.random.default_rng(seed)
+    return [[rng.uniform(50, 250, (rng.integers(2, 7), 2)) for _ in range(rng.integers(1, 4))]
+            for _ in range(count)]
+
+
+def bench_vector(strokes, labels, negatives, calibration=None, accept_confidence=0.95):
+    """Latency and accuracy of the point-cloud tier; with a calibration also what it would accept"""
+    recognizer = PointCloudRecognizer(calibration=calibration)
+    latencies, correct, confidences = [], [], []
+    for letter_strokes, label in zip(strokes, labels):
+        (letter, score, margin), elapsed_ms = timed(recognizer.recognize, letter_strokes)
+        latencies.append(elapsed_ms)
+        correct.append(letter == label)
+        confidences.append(recognizer.confidence(score, margin))
+    report = {"latency": summarize(latencies), "accuracy": float(np.mean(correct))}
+    if calibration is None:
+        return report
+
+    accepted = np.array(confidences) >= accept_confidence
+    false_accepts = [recognizer.confidence(*recognizer.recognize(s)[1:]) >= accept_confidence for s in negatives]
+    report.update({
+        "accept_rate": float(accepted.mean()),
+        "accepted_accuracy": float(np.array(correct)[accepted].mean()) if accepted.any() else 0.0,
+        # Drawings that are no letter at all but would skip the CNN
+        "scribble_accept_rate": float(np.mean(false_accepts)),
+    })
+    return report
+
+
+def bench_throughput(model, images, repeats):
+    """Images per second when predicting batches of several sizes"""
+    results = {}
+    for batch_size in THROUGHPUT_BATCH_SIZES:
+        batch = [images[i % len(images)] for i in range(batch_size)]
+        model.predict_batch(batch)  # Warm up
+        start = time.perf_counter()
+        for _ in range(repeats):
+            model.predict_batch(batch)
+        elapsed = time.perf_counter() - start
+        results[str(batch_size)] = {
+            "images_per_s": batch_size * repeats / elapsed,
+            "batch_ms": elapsed / repeats * 1000,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--backend", default=None, help="HandModel backend, guessed from the path by default")
+    parser.add_argument("--samples", type=int, default=260, help="Synthetic canvases to run")
+    parser.add_argument("--repeats", type=int, default=50, help="Repeats per throughput batch size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--strokes", help="Labeled JSONL of really drawn strokes for the vector tier")
+    parser.add_argument("--vector-calibration", help="Calibration JSON to evaluate the vector tier's accepts with")
+    parser.add_argument("--vector-accept", type=float, default=0.95)
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Compare against a previous --json run")
+    args = parser.parse_args()
+
+    canvases, strokes, labels = canvas_set(args.samples, args.seed)
+    rss_before = rss_mb()
+    model = HandModel(args.model, backend=args.backend)
+    model_rss = rss_mb() - rss_before
+
+    stages, accuracy = bench_pipeline(model, canvases, strokes, labels)
+    # The synthetic drawings come from the same glyphs as the templates, so
+    # only real strokes say how the vector tier does on actual drawings
+    vector_strokes, vector_labels = strokes, labels
+    if args.strokes:
+        vector_strokes, vector_labels = zip(*load_strokes(args.strokes))
+    calibration = load_calibration(args.vector_calibration) if args.vector_calibration else None
+    images = [image for canvas in canvases[:32] for image in prepare_variants(canvas)]
+    report = {
+        "config": {"model": args.model, "backend": model.backend, "samples": args.samples, "seed": args.seed},
+        "stages": stages,
+        "vector": bench_vector(vector_strokes, vector_labels, scribbles(args.samples, args.seed),
+                               calibration, args.vector_accept),
+        "throughput": bench_throughput(model, images, args.repeats),
+        "accuracy": accuracy,
+        "memory": {"model_rss_mb": model_rss, "peak_rss_mb": peak_rss_mb()},
+    }
+
+    print(f"{'stage':<10} | {'p50':>8} | {'p90':>8} | {'p99':>8}")
+    for name, row in stages.items():
+        print(f"{name:<10} | {row['p50_ms']:>6.3f}ms | {row['p90_ms']:>6.3f}ms | {row['p99_ms']:>6.3f}ms")
+    vector = report["vector"]
+    print(f"vector tier: {vector['latency']['p50_ms']:.3f}ms p50, {vector['accuracy']:.1%} accuracy "
+          f"on {'recorded' if args.strokes else 'synthetic'} strokes")
+    if calibration is not None:
+        print(f"vector tier accepts {vector['accept_rate']:.0%} at {vector['accepted_accuracy']:.1%} accuracy, "
+              f"and {vector['scribble_accept_rate']:.1%} of random scribbles")
+    for batch_size, row in report["throughput"].items():
+        print(f"batch {batch_size:>3}: {row['images_per_s']:>9.0f} images/s")
+    print(f"synthetic accuracy: {accuracy:.1%}, peak RSS: {report['memory']['peak_rss_mb']:.0f} MiB")
+
+    if args.json:
+        write_json(report, args.json)
+    if args.baseline:
+        regressions = compare_to_baseline(report, args.baseline)
+        if regressions:
+            raise SystemExit(f"{len(regressions)} metric(s) regressed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Synthetic hand-drawn canvases for webcam-free benchmarks"""
+import numpy as np
+
+from backend.src.glyphs import LETTERS, letter_strokes
+
+CANVAS_SIZE = (400, 400)
+STROKE_THICKNESS = 5  # Same as HandTracker
+
+
+def drawing_path(letter, rng, canvas_size=CANVAS_SIZE):
+    """Strokes of a letter at a random position and size on the canvas, like a user would draw it"""
+    width, height = canvas_size
+    size = rng.uniform(0.35, 0.7) * min(width, height)
+    x = rng.uniform(0.05 * width, width - size - 0.05 * width)
+    y = rng.uniform(0.05 * height, height - size - 0.05 * height)
+    return letter_strokes(letter, (x, y, size * rng.uniform(0.7, 1.0), size), rng, jitter=1.0)
+
+
+def render_canvas(strokes, canvas_size=CANVAS_SIZE, thickness=STROKE_THICKNESS):
+    """White-on-black single-channel canvas as produced by HandTracker"""
+    import cv2
+
+    canvas = np.zeros((canvas_size[1], canvas_size[0]), dtype=np.uint8)
+    for stroke in strokes:
+        for start, end in zip(stroke[:-1], stroke[1:]):
+            cv2.line(canvas, tuple(int(v) for v in start), tuple(int(v) for v in end), 255, thickness=thickness)
+    return canvas
+
+
+def canvas_set(count, seed=0):
+    """(canvases, strokes, labels) cycling through A-Z"""
+    rng = np.random.default_rng(seed)
+    labels = [LETTERS[i % len(LETTERS)] for i in range(count)]
+    strokes = [drawing_path(label, rng) for label in labels]
+    return [render_canvas(s) for s in strokes], strokes, labels
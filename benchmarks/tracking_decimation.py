@@ -0,0 +1,89 @@
+"""Tracker CPU and drawing error when MediaPipe runs on every Nth frame only
+
+Replays a recorded session through HandTracker once with detection on
+every frame, as the reference, and then at lower detection rates with the
+fingertips predicted in between. Reports the CPU time per frame and how
+far the predicted index fingertip strays from the reference, in canvas
+pixels, on frames where both runs see a hand.
+
+    python -m benchmarks.tracking_decimation --video session.mp4 --every 2 3 4 --budget 4
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.common import compare_to_baseline, write_json
+from benchmarks.hand_tracking import load_frames
+from backend.src.tracker import HandTracker
+
+
+def replay(frames, **tracker_options):
+    """Per-frame index fingertip (NaN without a hand) and the CPU cost of the run"""
+    tracker = HandTracker(max_hands=1, **tracker_options)
+    tips = np.full((len(frames), 2), np.nan)
+    cpu_start = time.process_time()
+    for i, frame in enumerate(frames):
+        result = tracker.track(frame)
+        if result.hand_detected:
+            tips[i] = result.index_finger_tip
+    cpu_ms = (time.process_time() - cpu_start) * 1000 / len(frames)
+    run = {"cpu_ms_per_frame": cpu_ms, "detections": tracker.detections, "frames": len(frames)}
+    tracker.release()
+    return tips, run
+
+
+def drawing_error(tips, reference, frame_width, canvas_width=400):
+    """Fingertip distance to the reference in canvas pixels, as drawn"""
+    both = ~np.isnan(tips[:, 0]) & ~np.isnan(reference[:, 0])
+    if not both.any():
+        return {"mean_px": float("nan"), "p95_px": float("nan"), "max_px": float("nan"), "coverage": 0.0}
+    errors = np.hypot(*(tips[both] - reference[both]).T) * canvas_width / frame_width
+    return {
+        "mean_px": float(errors.mean()),
+        "p95_px": float(np.percentile(errors, 95)),
+        "max_px": float(errors.max()),
+        # Reference frames with a hand that the decimated run also saw
+        "coverage": float(both.sum() / max(1, (~np.isnan(reference[:, 0])).sum())),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--video", required=True, help="Recorded session or video file to replay")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--every", type=int, nargs="+", default=[2, 3, 4], help="Detection intervals to try")
+    parser.add_argument("--budget", type=float, nargs="*", default=[], help="Adaptive detection budgets in ms")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Compare against a previous --json run")
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.frames)
+    frame_width = frames[0].shape[1]
+    reference, reference_run = replay(frames)
+
+    runs = {"every_1": reference_run}
+    for every in args.every:
+        tips, run = replay(frames, detect_every=every)
+        runs[f"every_{every}"] = {**run, "error": drawing_error(tips, reference, frame_width)}
+    for budget in args.budget:
+        tips, run = replay(frames, detect_budget_ms=budget)
+        runs[f"budget_{budget:g}ms"] = {**run, "error": drawing_error(tips, reference, frame_width)}
+
+    print(f"{'run':<14} | {'cpu/frame':>9} | {'detections':>10} | {'mean err':>8} | {'p95 err':>8} | {'max err':>8}")
+    for name, run in runs.items():
+        error = run.get("error", {"mean_px": 0.0, "p95_px": 0.0, "max_px": 0.0})
+        print(f"{name:<14} | {run['cpu_ms_per_frame']:>7.2f}ms | {run['detections']:>10} | "
+              f"{error['mean_px']:>6.2f}px | {error['p95_px']:>6.2f}px | {error['max_px']:>6.2f}px")
+
+    report = {"config": {"video": args.video, "frames": len(frames)}, "runs": runs}
+    if args.json:
+        write_json(report, args.json)
+    if args.baseline:
+        regressions = compare_to_baseline(report, args.baseline)
+        if regressions:
+            raise SystemExit(f"{len(regressions)} metric(s) regressed")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,7 +25,6 @@ def main(page: ft.Page):
     
     # Set up page properties
     page.title = "Hangman Game"
-    page.on_disconnect = lambda _: print("Page disconnected")
     
     # Initialize the app layout
     app_layout = AppLayout(page)
@@ -48,6 +47,13 @@ def main(page: ft.Page):
     # Set up the reset callback
     game_panel.on_reset = media_controls.reset
     
+    # Give the shared recognition model back when the session ends
+    def on_disconnect(e):
+        print("Page disconnected")
+        media_controls.release()
+    
+    page.on_disconnect = on_disconnect
+    
     # Create the layout with both panels
     app_layout.create_layout(
         left_panel=game_panel.create_panel(),
@@ -2,16 +2,24 @@ import flet as ft
 import sys
 import os
 import threading
-import time
 import cv2
 import numpy as np
-from PIL import Image
-import io
-import base64
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from backend.src.tracker import HandTracker
-from backend.src.hand_model import HandModel
+from backend.src.camera_pipeline import CameraPipeline
+from backend.src.hand_model import MODEL_PATH
+from backend.src.frame_encoder import FrameEncoder
+from backend.src.frame_scheduler import FrameScheduler
+from backend.src.frame_source import open_source
+from backend.src.model_registry import registry as model_registry
+from backend.src.point_cloud import PointCloudRecognizer, load_calibration
+from backend.src.prediction_cache import PredictionCache
+from backend.src.preprocessing import STROKE_THICKNESS, grow_bounds, prepare_variants
+from backend.src.recognition_policy import RecognitionPolicy
+from backend.src.segmentation import recognize_sequence, split_strokes
+from backend.src.speculative import SpeculativeRecognizer
+from backend.src.stroke_session import StrokeSessionDetector
 from config import config
 
 class HandDrawingRecognition(ft.Container):
@@ -25,22 +33,89 @@ class HandDrawingRecognition(ft.Container):
         self.padding = 10
         self.expand = True
         
-        # Initialize hand tracker and model
-        self.tracker = HandTracker(max_hands=1, min_detection_confidence=0.7)
-        self.model = HandModel()
+        # Initialize hand tracker and borrow the process-wide shared model
+        self.tracker = HandTracker(
+            max_hands=1,
+            min_detection_confidence=0.7,
+            roi_tracking=config.HAND_TRACKING_ROI,
+            detect_every=config.HAND_DETECT_EVERY,
+            detect_budget_ms=config.HAND_DETECT_BUDGET_MS
+        )
+        self.model = model_registry.acquire(
+            config.HAND_MODEL_PATH or MODEL_PATH,
+            config.HAND_MODEL_BACKEND,
+            batched=config.HAND_MODEL_BATCHING,
+            workers=config.HAND_MODEL_WORKERS
+        )
+        
+        # Cascade over the preprocessing variants, with optional vector and fast model tiers
+        self.fast_model = None
+        if config.RECOGNITION_FAST_MODEL_PATH:
+            self.fast_model = model_registry.acquire(config.RECOGNITION_FAST_MODEL_PATH)
+        vector_recognizer = None
+        if config.RECOGNITION_VECTOR_TIER:
+            if config.RECOGNITION_VECTOR_CALIBRATION:
+                vector_recognizer = PointCloudRecognizer(
+                    calibration=load_calibration(config.RECOGNITION_VECTOR_CALIBRATION))
+            else:
+                print("Vector tier disabled: RECOGNITION_VECTOR_CALIBRATION is not set")
+        self.recognition_policy = RecognitionPolicy(
+            variant_order=config.RECOGNITION_VARIANT_ORDER,
+            early_exit_confidence=config.RECOGNITION_EARLY_EXIT,
+            fast_model=self.fast_model,
+            fast_accept_confidence=config.RECOGNITION_FAST_ACCEPT,
+            vector_recognizer=vector_recognizer,
+            vector_accept_confidence=config.RECOGNITION_VECTOR_ACCEPT
+        )
+        
+        # Results for drawings already recognized, dropped when the canvas is cleared
+        self.prediction_cache = PredictionCache(maxsize=64)
+        self.tracker.add_clear_listener(self.prediction_cache.clear)
+        
+        # Background recognition of the canvas while the user is drawing
+        self.speculative = None
+        if config.SPECULATIVE_RECOGNITION:
+            self.speculative = SpeculativeRecognizer(
+                self._recognize_tracked,
+                min_interval=config.SPECULATIVE_INTERVAL,
+                settle_time=config.SPECULATIVE_INTERVAL,
+                on_result=self._show_live_guess
+            )
+            self.tracker.add_clear_listener(self.speculative.reset)
+        
+        # Pen-up detection that recognizes the letter without a button click
+        self.stroke_detector = None
+        if config.AUTO_RECOGNIZE:
+            self.stroke_detector = StrokeSessionDetector(
+                idle_timeout=config.AUTO_RECOGNIZE_IDLE,
+                hand_lost_timeout=config.AUTO_RECOGNIZE_HAND_LOST,
+                on_letter_finished=self._auto_recognize
+            )
+            self.tracker.add_clear_listener(self.stroke_detector.reset)
         
         # Video capture
-        self.video_capture = None
-        self.camera_thread = None
-        self.stop_thread = False
+        self.frame_source = None
+        self.camera_pipeline = None
         self.is_active = False
         
-        # Canvas for drawing
-        self.drawing_canvas = np.zeros((400, 400, 3), dtype=np.uint8)
+        # Canvas for drawing, and the tracker version it shows
+        self.drawing_canvas = np.zeros((400, 400), dtype=np.uint8)
+        self.drawing_canvas_version = None
+        self._canvas_image_lock = threading.Lock()
+        
+        # JPEG encoders for the previews; the canvas is only re-encoded when it changed
+        self.camera_encoder = FrameEncoder((370, 200), quality=90)
+        self.canvas_encoder = FrameEncoder((370, 200), quality=90)
+        
+        # Paces the UI updates, slower while the page cannot keep up
+        self.frame_scheduler = FrameScheduler(config.CAMERA_PREVIEW_FPS, config.CAMERA_PREVIEW_MIN_FPS)
         
         # Prediction data
         self.last_prediction = None
         self.prediction_confidence = 0.0
+        self.prediction_version = None  # Canvas version of the shown prediction
+        self.submitted_version = None  # Canvas version last submitted as a guess
+        self._submit_lock = threading.Lock()  # Auto-submit and the Recognize button may race
         self.on_prediction_callback = on_prediction_callback
         
         # Camera feed container - reduced size for horizontal layout
@@ -164,10 +239,10 @@ class HandDrawingRecognition(ft.Container):
     def start_camera(self):
         """Start camera and hand tracking"""
         try:
-            # Initialize video capture
-            self.video_capture = cv2.VideoCapture(0)
+            # Initialize the camera, or a video or recorded session to replay
+            self.frame_source = open_source(config.CAMERA_SOURCE, realtime=True, loop=True)
             
-            if not self.video_capture.isOpened():
+            if not self.frame_source.is_opened():
                 raise Exception("Could not open video device")
             
             # Set active flag
@@ -212,11 +287,17 @@ class HandDrawingRecognition(ft.Container):
             
             self.content = new_content
             
-            # Start camera thread
-            self.stop_thread = False
-            self.camera_thread = threading.Thread(target=self._camera_loop)
-            self.camera_thread.daemon = True
-            self.camera_thread.start()
+            # Capture, tracking and the UI update each run on their own thread and
+            # always take the newest frame, so a slow stage cannot make the preview lag
+            self.frame_scheduler.reset()
+            self.camera_pipeline = CameraPipeline(
+                self.frame_source,
+                track=self._track_frame,
+                publish=self._publish_frame,
+                prepare=lambda frame: cv2.flip(frame, 1),  # Mirror for a more intuitive experience
+                scheduler=self.frame_scheduler,
+            )
+            self.camera_pipeline.start()
             
         except Exception as e:
             print(f"Error starting camera: {e}")
@@ -230,18 +311,18 @@ class HandDrawingRecognition(ft.Container):
             return
         
         self.is_active = False
-        self.stop_thread = True
         self.status_label.value = "Hand Drawing Not Active"
         self.status_label.color = config.COLOR_PALETTE["secondary"]
         
-        # If camera thread is running, wait for it to terminate
-        if self.camera_thread and self.camera_thread.is_alive():
-            self.camera_thread.join(timeout=1.0)
+        # Wait for the pipeline threads to terminate
+        if self.camera_pipeline is not None:
+            self.camera_pipeline.stop()
+            self.camera_pipeline = None
         
         # Release the camera
-        if self.video_capture is not None:
-            self.video_capture.release()
-            self.video_capture = None
+        if self.frame_source is not None:
+            self.frame_source.release()
+            self.frame_source = None
         
         # Update layout to show placeholders - horizontal arrangement
         new_content = ft.Column([
@@ -276,134 +357,181 @@ class HandDrawingRecognition(ft.Container):
         
         self.content = new_content
     
+    def release(self):
+        """Stop the camera and give the shared model back when the session ends"""
+        self.stop_camera()
+        if self.speculative is not None:
+            self.speculative.stop()
+            self.speculative = None
+        if self.model is not None:
+            model_registry.release(self.model)
+            self.model = None
+        if self.fast_model is not None:
+            model_registry.release(self.fast_model)
+            self.fast_model = None
+        if self.tracker is not None:
+            self.tracker.release()
+            self.tracker = None
+    
+    def _clear_drawing(self):
+        """Empty the tracker's drawing and the canvas preview"""
+        self.tracker.clear_drawing()
+        # Update the canvas image
+        self._update_canvas_image()
+    
     def clear_canvas(self):
         """Clear the drawing canvas"""
         if self.tracker:
-            self.tracker.clear_drawing()
-            self.drawing_canvas = np.zeros((400, 400, 3), dtype=np.uint8)
-            # Update the canvas image
-            self._update_canvas_image()
+            self._clear_drawing()
             # Reset prediction
             self.prediction_text.value = ""
             self.prediction_text.color = config.COLOR_PALETTE["primary"]
             self.last_prediction = None
             self.prediction_confidence = 0.0
+            self.prediction_version = None
+    
+    def _recognize_canvas(self, canvas, drawing_path=None, drawing_bounds=None, version=None):
+        """Recognize a canvas without touching the UI, returns (prediction, confidence)
+        
+        version: the tracker's canvas version of this drawing, which lets an
+        unchanged drawing be found in the cache before any preprocessing
+        """
+        # Reuse the result when the same drawing was recognized before, by any tier
+        cache_key = None
+        if version is not None:
+            cache_key = self.prediction_cache.key_for_drawing(version, drawing_bounds)
+            cached = self._cached(cache_key)
+            if cached is not None:
+                return cached
+        
+        # A clear match of the strokes themselves needs no rasterized input at all
+        if drawing_path is not None and len(drawing_path):
+            result = self.recognition_policy.recognize_strokes(split_strokes(drawing_path))
+            if result is not None:
+                if cache_key is not None:
+                    self.prediction_cache.put(cache_key, (result.prediction, result.confidence))
+                return result.prediction, result.confidence
+        
+        # Crop, center and normalize the drawing into the model's input variants,
+        # looking only at the area the tracked points can have drawn on
+        bounds = grow_bounds(drawing_bounds, STROKE_THICKNESS) if drawing_bounds else None
+        batch = prepare_variants(canvas, bounds)
+        if batch is None:
+            return None, 0.0
+        
+        # Without a version, the preprocessed inputs identify the drawing
+        if cache_key is None:
+            cache_key = self.prediction_cache.key_for(np.stack(batch))
+            cached = self._cached(cache_key)
+            if cached is not None:
+                return cached
+        
+        # Stops after the first variant when the model is confident enough
+        result = self.recognition_policy.recognize(self.model, batch)
+        self.prediction_cache.put(cache_key, (result.prediction, result.confidence))
+        return result.prediction, result.confidence
+    
+    def _recognize_tracked(self, result):
+        """Background recognition of a tracking result, whose canvas is only taken now"""
+        canvas = result.canvas
+        if canvas is None:
+            # Drawn on or cleared since; a newer result is already on its way
+            return None, 0.0
+        return self._recognize_canvas(canvas, result.drawing_path, result.drawing_bounds, result.canvas_version)
+    
+    def _cached(self, cache_key):
+        cached = self.prediction_cache.get(cache_key)
+        if cached is not None:
+            print(f"Cached: {cached[0]}, Conf: {cached[1]:.4f}")
+        return cached
+    
+    def _show_live_guess(self, version, prediction, confidence):
+        """Show the background guess while the drawing is still in progress"""
+        if self.tracker is None or version != self.tracker.canvas_version or version == self.prediction_version:
+            return
+        self.prediction_text.value = f"{prediction}…"
+        self.prediction_text.color = config.COLOR_PALETTE["secondary"]
+        self.prediction_text.size = 24
+    
+    def _auto_recognize(self, version):
+        """Submit a finished letter through the prediction callback"""
+        if version == self.submitted_version:
+            return
+        
+        def run():
+            prediction, confidence = self.submit_letter(clear=True)
+            if prediction and self.on_prediction_callback:
+                self.on_prediction_callback(prediction, confidence)
+        
+        # Off the camera thread so the preview keeps running
+        threading.Thread(target=run, daemon=True).start()
+    
+    def submit_letter(self, min_confidence=0.5, clear=False):
+        """Recognize the drawn letter as a guess, once per drawing
+        
+        With clear, a guess confident enough to be submitted clears the canvas
+        for the next letter, while the prediction stays on screen. Returns
+        (None, 0.0) when this drawing was submitted already.
+        """
+        if self.tracker is None:
+            return None, 0.0
+        # Claim the drawing first, so a concurrent submit cannot guess it too
+        with self._submit_lock:
+            version = self.tracker.canvas_version
+            if version == self.submitted_version:
+                return None, 0.0
+            previous, self.submitted_version = self.submitted_version, version
+        prediction, confidence = self.recognize_letter() or (None, 0.0)
+        if not prediction or confidence <= min_confidence:
+            # Not a guess; let the drawing be submitted again once it is better
+            with self._submit_lock:
+                if self.submitted_version == version:
+                    self.submitted_version = previous
+        elif clear and self.tracker.canvas_version == version:
+            # Unless the user has already started on the next letter
+            self._clear_drawing()
+        return prediction, confidence
     
     def recognize_letter(self):
         """Recognize the drawn letter"""
         if not self.is_active or self.tracker is None:
             return
         
-        canvas = self.tracker.canvas
+        canvas, version, drawing_path, drawing_bounds = self.tracker.drawing_snapshot()
         if canvas is None or np.sum(canvas) == 0:
             self.prediction_text.value = "No drawing detected"
             self.prediction_text.color = config.COLOR_PALETTE["error"]
             return None, 0.0
         
         try:
-            # Convert the canvas to grayscale for prediction
-            gray_canvas = cv2.cvtColor(canvas, cv2.COLOR_BGR2GRAY)
-            
-            # EMNIST images have black letter on white background, but our canvas has white on black
-            gray_canvas = cv2.bitwise_not(gray_canvas)
-            
-            # Use a less aggressive threshold to preserve more detail
-            _, binary = cv2.threshold(gray_canvas, 100, 255, cv2.THRESH_BINARY)
+            # The background recognizer may already have seen this exact canvas
+            speculative = self.speculative.result_for(version) if self.speculative else None
+            if speculative is not None:
+                best_prediction, best_confidence = speculative
+                print(f"Speculative: {best_prediction}, Conf: {best_confidence:.4f}")
+            else:
+                best_prediction, best_confidence = self._recognize_canvas(canvas, drawing_path, drawing_bounds,
+                                                                          version)
             
-            # Find non-zero pixels for ROI detection
-            y_indices, x_indices = np.where(binary < 255)
-            
-            if len(y_indices) > 0 and len(x_indices) > 0:
-                # Find the bounds with all non-zero pixels
-                x_min, x_max = np.min(x_indices), np.max(x_indices)
-                y_min, y_max = np.min(y_indices), np.max(y_indices)
+            if best_prediction is not None:
+                # Update prediction display - show just the letter if confidence is good
+                self.last_prediction = best_prediction
+                self.prediction_confidence = best_confidence
+                self.prediction_version = version
                 
-                # Add padding around the letter
-                padding = 30
-                x_min = max(0, x_min - padding)
-                y_min = max(0, y_min - padding)
-                x_max = min(binary.shape[1], x_max + padding)
-                y_max = min(binary.shape[0], y_max + padding)
+                if best_confidence > 0.5:
+                    # Show just the letter prominently
+                    self.prediction_text.value = best_prediction
+                    self.prediction_text.color = ft.Colors.GREEN_600
+                    self.prediction_text.size = 48  # Large letter display
+                else:
+                    # Show with confidence if low confidence
+                    self.prediction_text.value = f"{best_prediction}?"
+                    self.prediction_text.color = ft.Colors.ORANGE_600
+                    self.prediction_text.size = 32
                 
-                # Extract the ROI containing the letter
-                if x_max > x_min and y_max > y_min:
-                    letter_roi = binary[y_min:y_max, x_min:x_max]
-                    
-                    # Create a square image with the letter centered
-                    max_dim = max(letter_roi.shape[0], letter_roi.shape[1])
-                    square_img = np.ones((max_dim, max_dim), dtype=np.uint8) * 255
-                    
-                    # Calculate offsets to center the letter
-                    offset_x = (max_dim - letter_roi.shape[1]) // 2
-                    offset_y = (max_dim - letter_roi.shape[0]) // 2
-                    
-                    # Place the letter in the center of the square
-                    square_img[offset_y:offset_y+letter_roi.shape[0], 
-                              offset_x:offset_x+letter_roi.shape[1]] = letter_roi
-                    
-                    # Try different preprocessing variations
-                    processed_versions = []
-                    
-                    # Original version
-                    processed_img = cv2.resize(square_img, (28, 28))
-                    processed_versions.append(("Original", processed_img))
-                    
-                    # Rotated version
-                    rotated_img = cv2.rotate(square_img, cv2.ROTATE_90_CLOCKWISE)
-                    processed_rotated = cv2.resize(rotated_img, (28, 28))
-                    processed_versions.append(("Rotated 90°", processed_rotated))
-                    
-                    # Dilated version
-                    kernel = np.ones((3, 3), np.uint8)
-                    dilated_img = cv2.dilate(square_img, kernel, iterations=1)
-                    processed_dilated = cv2.resize(dilated_img, (28, 28))
-                    processed_versions.append(("Dilated", processed_dilated))
-                    
-                    # Eroded version
-                    eroded_img = cv2.erode(square_img, kernel, iterations=1)
-                    processed_eroded = cv2.resize(eroded_img, (28, 28))
-                    processed_versions.append(("Eroded", processed_eroded))
-                    
-                    # Try different preprocessing approaches
-                    best_confidence = 0
-                    best_prediction = None
-                    
-                    for version_name, img in processed_versions:
-                        # Basic thresholding
-                        _, img = cv2.threshold(img, 180, 255, cv2.THRESH_BINARY)
-                        
-                        # Ensure white background with black letter
-                        if np.sum(img == 0) < np.sum(img == 255):
-                            pass  # Already white background
-                        else:
-                            img = cv2.bitwise_not(img)
-                        
-                        # Make prediction
-                        prediction, confidence = self.model.predict_from_memory(img)
-                        print(f"{version_name}: {prediction}, Conf: {confidence:.4f}")
-                        
-                        # Keep the best result
-                        if confidence > best_confidence:
-                            best_confidence = confidence
-                            best_prediction = prediction
-                    
-                    # Update prediction display - show just the letter if confidence is good
-                    self.last_prediction = best_prediction
-                    self.prediction_confidence = best_confidence
-                    
-                    if best_confidence > 0.5:
-                        # Show just the letter prominently
-                        self.prediction_text.value = best_prediction
-                        self.prediction_text.color = ft.Colors.GREEN_600
-                        self.prediction_text.size = 48  # Large letter display
-                    else:
-                        # Show with confidence if low confidence
-                        self.prediction_text.value = f"{best_prediction}?"
-                        self.prediction_text.color = ft.Colors.ORANGE_600
-                        self.prediction_text.size = 32
-                    
-                    # Return the prediction for the callback
-                    return best_prediction, best_confidence
+                # Return the prediction for the callback
+                return best_prediction, best_confidence
         
         except Exception as e:
             print(f"Error recognizing letter: {e}")
@@ -412,100 +540,91 @@ class HandDrawingRecognition(ft.Container):
             self.prediction_text.size = 24
             return None, 0.0
         
-        # Call the callback function with the prediction if we have one
-        if self.on_prediction_callback and self.last_prediction:
-            self.on_prediction_callback(self.last_prediction, self.prediction_confidence)
-            
-        return self.last_prediction, self.prediction_confidence
+        # Nothing recognizable; the previous prediction was submitted already
+        return None, 0.0
+    
+    def recognize_word(self):
+        """Recognize every letter drawn on the canvas, left to right
+        
+        Returns a list of (letter, confidence).
+        """
+        # Canvas and path of the same moment, so the strokes split where the ink is
+        snapshot = self.tracker.drawing_snapshot() if self.is_active and self.tracker is not None else None
+        if snapshot is None or len(snapshot[2]) == 0:
+            self.prediction_text.value = "No drawing detected"
+            self.prediction_text.color = config.COLOR_PALETTE["error"]
+            return []
+        canvas, version, drawing_path, _ = snapshot
+        
+        try:
+            letters = recognize_sequence(self.model, canvas, drawing_path)
+        except Exception as e:
+            print(f"Error recognizing letters: {e}")
+            self.prediction_text.value = "Error"
+            self.prediction_text.color = config.COLOR_PALETTE["error"]
+            self.prediction_text.size = 24
+            return []
+        
+        print(f"Recognized sequence: {letters}")
+        self.prediction_text.value = " ".join(
+            letter if confidence > 0.5 else f"{letter}?" for letter, confidence in letters
+        )
+        self.prediction_text.color = ft.Colors.GREEN_600
+        self.prediction_text.size = 32
+        self.prediction_version = version
+        return letters
+    
+    def _track_frame(self, frame):
+        """Tracking stage of the camera pipeline"""
+        # Track the hand; the preview is rendered later by the publishing stage
+        result = self.tracker.track(frame)
+        
+        # Let the background recognizer know about new strokes; it takes the
+        # canvas only once the drawing has settled, so drawing copies nothing
+        if self.speculative is not None and len(result.drawing_path):
+            self.speculative.notify(result.canvas_version, result)
+        
+        # Finish the letter automatically once the user stops drawing
+        if self.stroke_detector is not None:
+            self.stroke_detector.update(result)
+        return result
     
-    def _camera_loop(self):
-        """Camera capture loop running in a separate thread"""
-        # Helper function to update UI
-        def update_ui():
-            try:
-                # Capture the page reference once
-                page_ref = getattr(ft, 'page', None)
-                if page_ref is not None:
-                    # Use a single update to refresh the entire component
-                    # This is safer than updating individual containers
+    def _publish_frame(self, frame, result):
+        """Publishing stage of the camera pipeline: encode the previews and update the UI"""
+        annotated_frame = self.tracker.render_preview(frame, result)
+        self.camera_image.src_base64 = self.camera_encoder.encode(annotated_frame)
+        
+        # Update the canvas image
+        self._update_canvas_image()
+        
+        try:
+            # Capture the page reference once
+            page_ref = getattr(ft, 'page', None)
+            if page_ref is not None:
+                # Use a single update to refresh the entire component
+                # This is safer than updating individual containers
+                with self.frame_scheduler.measure_update():
                     page_ref.update(self)
-            except AssertionError:
-                # Silently ignore assertion errors which are common during initialization
-                pass
-            except Exception as e:
-                # Log other errors without causing a broken pipe
-                print(f"Camera update error: {str(e)[:100]}")
-        
-        # Loop while active
-        while not self.stop_thread and self.video_capture and self.video_capture.isOpened():
-            try:
-                # Read a frame from the camera
-                ret, frame = self.video_capture.read()
-                if not ret:
-                    print("Failed to capture frame")
-                    break
-                
-                # Flip the frame horizontally for a more intuitive experience
-                frame = cv2.flip(frame, 1)
-                
-                # Process the frame with the hand tracker
-                annotated_frame, result = self.tracker.process_frame(frame)
-                
-                # Update the drawing canvas
-                self.drawing_canvas = result.canvas.copy()
-                
-                # Convert the frame to format usable by Flet
-                img_camera = Image.fromarray(cv2.cvtColor(annotated_frame, cv2.COLOR_BGR2RGB))
-                
-                # Resize to fill container using new height for vertical layout
-                img_camera = img_camera.resize((370, 200))
-                
-                # Convert to base64
-                buffer_camera = io.BytesIO()
-                img_camera.save(buffer_camera, format='JPEG', quality=90)
-                img_camera_base64 = base64.b64encode(buffer_camera.getvalue()).decode('utf-8')
-                
-                # Update the camera image
-                self.camera_image.src_base64 = img_camera_base64
-                
-                # Update the canvas image
-                self._update_canvas_image()
-                
-                # Request UI update
-                update_ui()
-                
-                # Control frame rate
-                time.sleep(0.03)  # ~30 FPS
-                
-            except Exception as e:
-                print(f"Error in camera loop: {e}")
-                time.sleep(0.1)
-        
-        # Clean up
-        if self.video_capture:
-            self.video_capture.release()
-            self.video_capture = None
-            print("Camera released")
+        except AssertionError:
+            # Silently ignore assertion errors which are common during initialization
+            pass
+        except Exception as e:
+            # Log other errors without causing a broken pipe
+            print(f"Camera update error: {str(e)[:100]}")
     
     def _update_canvas_image(self):
-        """Update the canvas image from the drawing canvas"""
+        """Update the canvas image from the tracker's canvas"""
         try:
-            # Create a copy of the canvas with cursor visualization
-            canvas_with_cursor = self.drawing_canvas.copy()
-            
-            # Convert the canvas to format usable by Flet
-            img_canvas = Image.fromarray(cv2.cvtColor(canvas_with_cursor, cv2.COLOR_BGR2RGB))
-            
-            # Resize to fill container - use new height for vertical layout
-            img_canvas = img_canvas.resize((370, 200))
-            
-            # Convert to base64
-            buffer_canvas = io.BytesIO()
-            img_canvas.save(buffer_canvas, format='JPEG', quality=90)
-            img_canvas_base64 = base64.b64encode(buffer_canvas.getvalue()).decode('utf-8')
-            
-            # Update the canvas image
-            self.canvas_image.src_base64 = img_canvas_base64
+            # Nothing to take or send when the canvas is still the version on screen;
+            # the publish thread and a clear may both get here
+            with self._canvas_image_lock:
+                changed = self.tracker.changed_canvas(self.drawing_canvas_version)
+                if changed is None or changed[0] is None:
+                    return
+                self.drawing_canvas, self.drawing_canvas_version = changed
+                encoded = self.canvas_encoder.encode(self.drawing_canvas, self.drawing_canvas_version)
+            if encoded is not None:
+                self.canvas_image.src_base64 = encoded
         except Exception as e:
             # Catch any errors that might occur during image processing
             print(f"Error updating canvas image: {str(e)[:100]}")
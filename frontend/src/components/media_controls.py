@@ -100,6 +100,14 @@ class MediaControls:
             visible=True
         )
         
+        self.drawing_recognize_word_btn = ft.ElevatedButton(
+            "Recognize Word",
+            icon=ft.Icons.TEXT_FIELDS,
+            on_click=self._recognize_drawn_word,
+            style=config.BUTTON_STYLE,
+            visible=True
+        )
+        
         # Currently active view (to track which one is open)
         self.active_view = None
         self.current_tab = "chat"  # Changed default tab to chat
@@ -234,6 +242,8 @@ class MediaControls:
                                alignment=ft.MainAxisAlignment.CENTER),
                         ft.Row([self.drawing_clear_btn, self.drawing_recognize_btn], 
                                alignment=ft.MainAxisAlignment.CENTER),
+                        ft.Row([self.drawing_recognize_word_btn],
+                               alignment=ft.MainAxisAlignment.CENTER),
                     ], spacing=4),
                 ], spacing=4),
                 margin=0,
@@ -440,8 +450,10 @@ class MediaControls:
     
     def _recognize_drawn_letter(self, e):
         if self.active_view == "drawing":
-            # Recognize the letter - no need to show notification here anymore
-            prediction, confidence = self.hand_drawing.recognize_letter()
+            # Recognize the letter - no need to show notification here anymore.
+            # A drawing that was already submitted, e.g. automatically, is not guessed again.
+            # The drawing stays on the canvas
+            prediction, confidence = self.hand_drawing.submit_letter()
             
             # If the recognition returned a valid prediction directly
             if prediction and confidence > 0.5:
@@ -449,6 +461,13 @@ class MediaControls:
                 # Instead of a notification, the result is displayed in the UI
             # The UI will show a message if confidence is insufficient
     
+    def _recognize_drawn_word(self, e):
+        if self.active_view == "drawing":
+            # Every confident letter on the canvas becomes a guess, left to right
+            for prediction, confidence in self.hand_drawing.recognize_word():
+                if confidence > 0.5:
+                    self.on_guess(prediction)
+    
     def _handle_drawing_prediction(self, prediction, confidence):
         """Handle prediction result from hand drawing recognition"""
         if confidence > 0.5:  # Only use prediction if confidence is reasonable
@@ -489,6 +508,11 @@ class MediaControls:
         # Clear the agent inputs as well
         self.agent_inputs = []
         
+    def release(self):
+        """Free per-session resources when the page disconnects"""
+        self._reset_all_views()
+        self.hand_drawing.release()
+        
     def create_panel(self):
         """Create the left panel with media controls"""
         return ft.Container(
@@ -5,11 +5,11 @@ import random
 import time
 import threading
 import cv2
-from PIL import Image
-import io
-import base64
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import config
+from backend.src.frame_encoder import FrameEncoder
+from backend.src.frame_scheduler import FrameScheduler
+from backend.src.frame_source import open_source
 
 class VoiceAnimation(ft.Container):
     def __init__(self):
@@ -192,9 +192,11 @@ class CameraView(ft.Container):
         self.padding = 8  # Reduced padding
         self.camera_active = False
         self.expand = True
-        self.video_capture = None
+        self.frame_source = None
         self.camera_thread = None
         self.stop_thread = False
+        self.encoder = FrameEncoder((370, 320), quality=90)
+        self.scheduler = FrameScheduler(config.CAMERA_PREVIEW_FPS, config.CAMERA_PREVIEW_MIN_FPS)
         
         # Container to hold the camera image (this provides better control)
         self.image_container = ft.Container(
@@ -249,10 +251,10 @@ class CameraView(ft.Container):
     def start_camera(self):
         """Start camera capture"""
         try:
-            # Initialize video capture (0 is usually the default webcam)
-            self.video_capture = cv2.VideoCapture(0)
+            # Initialize the camera, or a video or recorded session to replay
+            self.frame_source = open_source(config.CAMERA_SOURCE, realtime=True, loop=True)
             
-            if not self.video_capture.isOpened():
+            if not self.frame_source.is_opened():
                 raise Exception("Could not open video device")
                 
             # Set camera active
@@ -299,9 +301,9 @@ class CameraView(ft.Container):
             self.camera_thread.join(timeout=1.0)
             
         # Release the camera
-        if self.video_capture is not None:
-            self.video_capture.release()
-            self.video_capture = None
+        if self.frame_source is not None:
+            self.frame_source.release()
+            self.frame_source = None
             
         # Update layout to show placeholder
         new_content = ft.Column([
@@ -319,55 +321,44 @@ class CameraView(ft.Container):
             try:
                 if hasattr(ft, 'page') and ft.page is not None:
                     # Update the entire container instead of just the image
-                    ft.page.update(self.image_container)
+                    with self.scheduler.measure_update():
+                        ft.page.update(self.image_container)
             except Exception as e:
                 print(f"Error updating camera image: {e}")
         
         # Get device aspect ratio
-        if self.video_capture:
-            frame_width = self.video_capture.get(cv2.CAP_PROP_FRAME_WIDTH)
-            frame_height = self.video_capture.get(cv2.CAP_PROP_FRAME_HEIGHT)
+        if self.frame_source:
+            frame_width = self.frame_source.width
+            frame_height = self.frame_source.height
             aspect_ratio = frame_width / frame_height if frame_height > 0 else 4/3
             print(f"Camera aspect ratio: {aspect_ratio}")
         
-        # Process frames while active
-        while not self.stop_thread and self.video_capture and self.video_capture.isOpened():
+        # Process frames while active, one per deadline of the scheduler
+        self.scheduler.reset()
+        while not self.stop_thread and self.frame_source and self.frame_source.is_opened():
             try:
+                self.scheduler.wait()
+                
                 # Read a frame from the camera
-                ret, frame = self.video_capture.read()
+                ret, frame = self.frame_source.read()
                 if not ret:
                     print("Failed to capture frame")
                     break
                 
-                # Convert frame to format usable by Flet
                 frame = cv2.flip(frame, 1)  # Mirror effect
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                img = Image.fromarray(rgb_frame)
-                
-                # Resize to fill container completely
-                # Using a slightly larger size to ensure no gaps
-                img = img.resize((370, 320))
                 
-                # Convert to base64 with higher quality
-                buffer = io.BytesIO()
-                img.save(buffer, format='JPEG', quality=90)  # Increased quality further
-                img_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-                
-                # Update the image source
-                self.camera_image.src_base64 = img_base64
+                # Encode at a size slightly larger than the container, so there are no gaps
+                self.camera_image.src_base64 = self.encoder.encode(frame)
                 
                 # Request UI update
                 update_image()
                 
-                # Control frame rate
-                time.sleep(0.03)  # ~30 FPS
-                
             except Exception as e:
                 print(f"Error in camera loop: {e}")
                 time.sleep(0.1)
                 
         # Make sure to release the camera when the loop exits
-        if self.video_capture:
-            self.video_capture.release()
-            self.video_capture = None
+        if self.frame_source:
+            self.frame_source.release()
+            self.frame_source = None
             print("Camera released")
@@ -30,3 +30,68 @@ STATUS_STYLE = TextStyle(
     size=18,
     color=COLOR_PALETTE["secondary"]
 )
+
+# Letter recognition model shared by all sessions. None selects the bundled
+# letter_recognition.h5 and the backend matching the model file.
+HAND_MODEL_PATH = None
+HAND_MODEL_BACKEND = None
+
+# Coalesce recognition requests from concurrent sessions into shared batches
+HAND_MODEL_BATCHING = True
+
+# Run recognition in this many separate worker processes, 0 keeps it in the
+# server process
+HAND_MODEL_WORKERS = 0
+
+# Recognition cascade: variants are tried in this order and recognition stops
+# once one reaches RECOGNITION_EARLY_EXIT (None runs them all). A fast model
+# such as the int8 .tflite is tried first when set, and its result is kept
+# above RECOGNITION_FAST_ACCEPT.
+RECOGNITION_VARIANT_ORDER = ("Original", "Rotated 90°", "Dilated", "Eroded")
+RECOGNITION_EARLY_EXIT = 0.9
+RECOGNITION_FAST_MODEL_PATH = None
+RECOGNITION_FAST_ACCEPT = 0.95
+
+# Match the raw strokes against A-Z point-cloud templates before the CNN.
+# Needs a calibration fitted on really drawn, labeled strokes (see
+# backend/src/point_cloud.py); matches whose calibrated confidence reaches
+# RECOGNITION_VECTOR_ACCEPT are kept without the CNN. Off until calibrated:
+# no calibration ships, as the repo has no really drawn strokes, and one
+# fitted on the synthetic glyphs the templates are made from would only
+# vouch for the templates themselves.
+RECOGNITION_VECTOR_TIER = False
+RECOGNITION_VECTOR_CALIBRATION = None
+RECOGNITION_VECTOR_ACCEPT = 0.95
+
+# Recognize the canvas in the background while drawing, at most every
+# SPECULATIVE_INTERVAL seconds once the strokes pause, and show a live guess
+SPECULATIVE_RECOGNITION = True
+SPECULATIVE_INTERVAL = 0.3
+
+# Recognize and submit the letter automatically once the user stops drawing
+# for AUTO_RECOGNIZE_IDLE seconds or the hand is out of the camera for
+# AUTO_RECOGNIZE_HAND_LOST seconds. The canvas is then cleared for the next
+# letter.
+AUTO_RECOGNIZE = True
+AUTO_RECOGNIZE_IDLE = 1.2
+AUTO_RECOGNIZE_HAND_LOST = 1.5
+
+# Track the hand inside a downscaled box around its last position instead of
+# the whole camera frame, back to full-frame detection when it is lost. Worth
+# it where benchmarks.hand_tracking shows the full frame costing more.
+HAND_TRACKING_ROI = False
+
+# Run hand detection on every HAND_DETECT_EVERY-th frame only and predict the
+# fingertip in between. With HAND_DETECT_BUDGET_MS set, the interval adapts
+# to keep detection within that many milliseconds per frame on average.
+HAND_DETECT_EVERY = 1
+HAND_DETECT_BUDGET_MS = None
+
+# Where frames come from: a camera index, a video file or a recorded session
+# directory (see backend/src/frame_source.py), replayed in a loop
+CAMERA_SOURCE = 0
+
+# Frame rate of the camera previews. The previews slow down to no less than
+# CAMERA_PREVIEW_MIN_FPS while page updates take longer than a frame.
+CAMERA_PREVIEW_FPS = 30
+CAMERA_PREVIEW_MIN_FPS = 5
@@ -0,0 +1,113 @@
+"""Every stage of the fused preprocessing against the legacy full-canvas path"""
+import cv2
+import numpy as np
+import pytest
+
+from backend.src.glyphs import LETTERS, letter_strokes
+from backend.src.preprocessing import (INPUT_SIZE, ROI_PADDING, STROKE_THICKNESS, _variant_transforms,
+                                       build_variants, extract_letter_square, fused_variants, ink_bounds,
+                                       prepare_variants, stroke_bounds)
+
+# Differing pixels allowed per 28x28 variant, out of 784
+MAX_DIFF = 8
+
+
+def render(strokes, size=(400, 400)):
+    """White-on-black single-channel canvas, drawn like HandTracker does"""
+    canvas = np.zeros((size[1], size[0]), dtype=np.uint8)
+    for stroke in strokes:
+        for start, end in zip(stroke[:-1], stroke[1:]):
+            cv2.line(canvas, tuple(int(v) for v in start), tuple(int(v) for v in end), 255,
+                     thickness=STROKE_THICKNESS)
+    return canvas
+
+
+def drawings(count=52, seed=0):
+    """(canvas, points) of letters at random positions and sizes"""
+    rng = np.random.default_rng(seed)
+    for i in range(count):
+        size = rng.uniform(100, 250)
+        x, y = rng.uniform(10, 390 - size, 2)
+        strokes = letter_strokes(LETTERS[i % len(LETTERS)], (x, y, size * rng.uniform(0.6, 1.0), size), rng,
+                                 jitter=1.0)
+        yield render(strokes), np.concatenate(strokes)
+
+
+def test_stroke_bounds_contain_all_ink():
+    for canvas, points in drawings():
+        x_min, y_min, x_max, y_max = stroke_bounds(points)
+        ys, xs = np.nonzero(canvas)
+        assert x_min <= xs.min() and xs.max() <= x_max
+        assert y_min <= ys.min() and ys.max() <= y_max
+
+
+def test_stroke_bounds_grow_by_thickness():
+    assert stroke_bounds([(10, 20), (30, 5)]) == (10 - STROKE_THICKNESS, 5 - STROKE_THICKNESS,
+                                                  30 + STROKE_THICKNESS, 20 + STROKE_THICKNESS)
+    assert stroke_bounds(np.zeros((0, 2))) is None
+
+
+def test_ink_bounds_are_exact():
+    for canvas, points in drawings():
+        ys, xs = np.nonzero(canvas)
+        expected = (xs.min(), ys.min(), xs.max(), ys.max())
+        assert ink_bounds(canvas) == expected
+        # A hint containing all ink gives the same answer
+        assert ink_bounds(canvas, stroke_bounds(points)) == expected
+        assert ink_bounds(cv2.cvtColor(canvas, cv2.COLOR_GRAY2BGR)) == expected
+
+
+def test_ink_bounds_of_empty_canvas():
+    canvas = np.zeros((400, 400), dtype=np.uint8)
+    assert ink_bounds(canvas) is None
+    assert ink_bounds(canvas, (500, 500, 600, 600)) is None
+
+
+@pytest.mark.parametrize("roi_shape", [(120, 80), (80, 120), (97, 97), (31, 200)])
+def test_variant_transforms_match_square_and_resize(roi_shape):
+    rng = np.random.default_rng(sum(roi_shape))
+    height, width = roi_shape
+    roi = np.where(rng.random(roi_shape) < 0.2, 255, 0).astype(np.uint8)
+    roi = cv2.GaussianBlur(roi, (5, 5), 0)
+    # The ROI inside a larger image, at an offset
+    image = np.zeros((height + 20, width + 30), dtype=np.uint8)
+    image[12:12 + height, 7:7 + width] = roi
+
+    square_size = max(roi_shape)
+    square = np.zeros((square_size, square_size), dtype=np.uint8)
+    offset_x, offset_y = (square_size - width) // 2, (square_size - height) // 2
+    square[offset_y:offset_y + height, offset_x:offset_x + width] = roi
+    expected = [cv2.resize(square, (INPUT_SIZE, INPUT_SIZE)),
+                cv2.resize(cv2.rotate(square, cv2.ROTATE_90_CLOCKWISE), (INPUT_SIZE, INPUT_SIZE))]
+
+    straight, rotated, dilated, eroded = _variant_transforms(roi_shape, (7, 12), square_size)
+    assert np.array_equal(straight, dilated) and np.array_equal(straight, eroded)
+    for matrix, reference in zip((straight, rotated), expected):
+        warped = cv2.warpAffine(image, matrix, (INPUT_SIZE, INPUT_SIZE), flags=cv2.INTER_LINEAR)
+        # Same bilinear sampling, only rounded differently
+        assert np.abs(warped.astype(int) - reference.astype(int)).max() <= 1
+
+
+def test_fused_variants_match_legacy():
+    for canvas, points in drawings():
+        legacy = build_variants(extract_letter_square(canvas))
+        for bounds in (None, stroke_bounds(points)):
+            fused = fused_variants(canvas, bounds)
+            assert len(fused) == len(legacy)
+            for old, new in zip(legacy, fused):
+                assert new.shape == (INPUT_SIZE, INPUT_SIZE) and new.dtype == np.uint8
+                assert np.count_nonzero(old != new) <= MAX_DIFF
+
+
+def test_fused_variants_near_the_canvas_edge():
+    canvas = render([np.array([(2, 2), (60, 2), (2, 80)])])
+    legacy = build_variants(extract_letter_square(canvas, ROI_PADDING))
+    for old, new in zip(legacy, fused_variants(canvas)):
+        assert np.count_nonzero(old != new) <= MAX_DIFF
+
+
+def test_nothing_drawn():
+    canvas = np.zeros((400, 400), dtype=np.uint8)
+    assert fused_variants(canvas) is None
+    assert prepare_variants(canvas) is None
+    assert extract_letter_square(canvas) is None